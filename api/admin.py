@@ -17,6 +17,7 @@ from .models import News
 from .models import ExamPendingRequest
 from .models import ExamPendingRequestVideo
 from .models import FileUpload
+from .models import TranscodingMetric
 
 
 class DeviceForm(forms.ModelForm):
@@ -47,6 +48,28 @@ class ExamAdmin(admin.ModelAdmin):
     form = ExamForm
 
 
+class TranscodingMetricInline(admin.TabularInline):
+    model = TranscodingMetric
+    extra = 0
+    can_delete = False
+    fields = ('created', 'worker', 'attempt', 'renditions', 'preset', 'queue_wait', 'wall_time', 'speed', 'decode_fps',
+              'encode_fps', 'input_bytes', 'output_bytes', 'succeeded', 'final_message')
+    readonly_fields = fields
+
+
+class ExamPendingRequestAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created', 'taker', 'exercise', 'device', 'status', 'priority', 'attempts', 'claimed_by', 'claimed_at', 'is_processed')
+    list_filter = ('status', 'priority', 'is_processed')
+    readonly_fields = ('last_error',)
+    inlines = (TranscodingMetricInline,)
+
+
+class TranscodingMetricAdmin(admin.ModelAdmin):
+    list_display = ('id', 'created', 'pending_request', 'worker', 'renditions', 'preset', 'queue_wait', 'wall_time', 'speed',
+                    'decode_fps', 'encode_fps', 'input_bytes', 'output_bytes', 'succeeded')
+    list_filter = ('succeeded', 'renditions', 'preset', 'worker')
+
+
 class MyUserAdmin(UserAdmin):
     list_display = ('email', 'first_name', 'last_name', 'is_staff', 'role', 'created_by', 'updated_by','is_verified', 'date_verified', 'pic')
     list_filter = ('is_staff', 'is_superuser', 'is_active', 'role')
@@ -79,8 +102,9 @@ admin.site.unregister(Group)
 admin.site.register(MailRequest)
 admin.site.register(DeviceBroadCast)
 admin.site.register(News)
-admin.site.register(ExamPendingRequest)
+admin.site.register(ExamPendingRequest, ExamPendingRequestAdmin)
 admin.site.register(ExamPendingRequestVideo)
 admin.site.register(FileUpload)
+admin.site.register(TranscodingMetric, TranscodingMetricAdmin)
 
 admin.site.site_header = 'PSQ Admin'
@@ -1,3 +1,6 @@
 from .non_overlapping_cron_job import NonOverlappingCronJob
 from .mail_job import MailCronJob
 from .exam_pending_requests_job import ExamPendingRequestsJob
+
+from .lazy_renditions_eviction_job import LazyRenditionsEvictionJob
+from .upload_reaper_job import UploadReaperJob
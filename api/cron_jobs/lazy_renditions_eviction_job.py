@@ -0,0 +1,15 @@
+from django_cron import Schedule
+from ..cron_jobs import NonOverlappingCronJob
+from ..processors import LazyRenditionProcessor
+from django.conf import settings
+
+
+class LazyRenditionsEvictionJob(NonOverlappingCronJob):
+    RUN_EVERY_MINS = 60  # every hour
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = 'api.LazyRenditionsEvictionJob'  # a unique code
+
+    def _run(self):
+        if not settings.EXAM_VIDEO_LAZY_RENDITIONS:
+            return
+        LazyRenditionProcessor().evict(settings.EXAM_VIDEO_LAZY_MAX_IDLE, settings.EXAM_VIDEO_LAZY_CACHE_SIZE)
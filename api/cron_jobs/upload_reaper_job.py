@@ -0,0 +1,14 @@
+from django_cron import Schedule
+from ..cron_jobs import NonOverlappingCronJob
+from ..processors import UploadReaper
+from django.conf import settings
+
+
+class UploadReaperJob(NonOverlappingCronJob):
+    RUN_EVERY_MINS = 6 * 60  # every 6 hours
+    schedule = Schedule(run_every_mins=RUN_EVERY_MINS)
+    code = 'api.UploadReaperJob'  # a unique code
+
+    def _run(self):
+        UploadReaper(settings.UPLOAD_REAPER_TTL, settings.UPLOAD_REAPER_BATCH_SIZE,
+                     settings.TRANSCODING_CLAIM_TIMEOUT).reap()
@@ -1,4 +1,5 @@
 from .custom_validation_error import CustomValidationError
 from .authz_error import AuthzError
+from .service_unavailable_error import ServiceUnavailableError
 from .custom_exception_handler import *
 
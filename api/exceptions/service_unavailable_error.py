@@ -0,0 +1,25 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException, _get_error_details
+from django.utils.translation import ugettext_lazy as _
+
+
+class ServiceUnavailableError(APIException):
+    """
+    the request can not be handled right now, the client should retry after wait seconds
+    ( sent on the Retry-After header )
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Service temporarily unavailable, try again later.')
+    default_code = 'service_unavailable'
+
+    def __init__(self, detail=None, code=None, wait=None):
+        if detail is None:
+            detail = self.default_detail
+        if code is None:
+            code = self.default_code
+
+        if not isinstance(detail, dict) and not isinstance(detail, list):
+            detail = [detail]
+
+        self.detail = _get_error_details(detail, code)
+        self.wait = wait
@@ -0,0 +1,78 @@
+from django.core.management.base import BaseCommand, CommandError
+import os
+import shutil
+import tempfile
+from ...video_utils import init_gstreamer
+from ...video_utils.benchmark import build_test_clip, get_transcoder_classes, run_benchmark, get_benchmark_key, \
+    load_baseline, save_baseline, get_regressions
+
+
+class Command(BaseCommand):
+    help = 'Runs every transcoder against synthetic MJPEG/MKV clips and reports fps, real time factor and output size'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resolutions', default='640x360,1280x720',
+                            help='comma separated WIDTHxHEIGHT list')
+        parser.add_argument('--lengths', default='10,60',
+                            help='comma separated clip lengths in seconds')
+        parser.add_argument('--framerate', type=int, default=30)
+        parser.add_argument('--transcoders', default='',
+                            help='comma separated transcoder class names, all by default')
+        parser.add_argument('--presets', default='default',
+                            help='comma separated encoder preset names')
+        parser.add_argument('--baseline', default='transcoders_baseline.json',
+                            help='json file with the baseline fps per benchmark')
+        parser.add_argument('--tolerance', type=float, default=0.1,
+                            help='allowed fps drop below the baseline ( 0..1 )')
+        parser.add_argument('--update-baseline', action='store_true',
+                            help='stores the results as the new baseline instead of checking them')
+
+    def handle(self, *args, **options):
+        init_gstreamer()
+        resolutions = [tuple(int(size) for size in resolution.split('x'))
+                       for resolution in options['resolutions'].split(',') if resolution.strip()]
+        lengths = [int(length) for length in options['lengths'].split(',') if length.strip()]
+        presets = [preset.strip() for preset in options['presets'].split(',') if preset.strip()]
+        names = [name.strip() for name in options['transcoders'].split(',') if name.strip()]
+        transcoder_classes = [transcoder_class for transcoder_class in get_transcoder_classes()
+                              if not names or transcoder_class.__name__ in names]
+        if not transcoder_classes:
+            raise CommandError("no transcoders to benchmark")
+
+        results = {}
+        work_folder = tempfile.mkdtemp(prefix='transcoders_benchmark_')
+        try:
+            for width, height in resolutions:
+                for seconds in lengths:
+                    clip_file = os.path.join(work_folder, "clip_{width}x{height}_{seconds}.mkv".format(
+                        width=width, height=height, seconds=seconds))
+                    frames = build_test_clip(clip_file, width, height, seconds, options['framerate'])
+                    for transcoder_class in transcoder_classes:
+                        for preset in presets:
+                            output_folder = tempfile.mkdtemp(dir=work_folder)
+                            key = get_benchmark_key(transcoder_class, preset, width, height, seconds)
+                            result = run_benchmark(transcoder_class, clip_file, output_folder, frames, seconds,
+                                                   preset)
+                            shutil.rmtree(output_folder, ignore_errors=True)
+                            if result['error'] is not None:
+                                raise CommandError("{key} failed: {error}".format(key=key, error=result['error']))
+                            results[key] = result
+                            self.stdout.write("{key:<55} {fps:>8.1f} fps {rtf:>6.3f} rtf {size:>12} bytes".format(
+                                key=key,
+                                fps=result['fps'],
+                                rtf=result['rtf'],
+                                size=result['output_bytes']))
+        finally:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+        if options['update_baseline']:
+            save_baseline(options['baseline'], results)
+            self.stdout.write("baseline saved on {baseline}".format(baseline=options['baseline']))
+            return
+
+        regressions = get_regressions(load_baseline(options['baseline']), results, options['tolerance'])
+        for key, baseline_fps, fps in regressions:
+            self.stderr.write("{key} regressed {baseline_fps:.1f} -> {fps:.1f} fps".format(
+                key=key, baseline_fps=baseline_fps, fps=fps))
+        if regressions:
+            raise CommandError("{count} transcoders below the baseline".format(count=len(regressions)))
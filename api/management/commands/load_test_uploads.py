@@ -0,0 +1,86 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...utils.upload_load_test import UploadLoadTest
+from ...video_utils import init_gstreamer
+
+
+class Command(BaseCommand):
+    help = 'Simulates devices uploading synthetic recordings to a running server at increasing concurrency and ' \
+           'reports throughput, p50/p99 chunk latency and error rate'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help='base url of the server under test')
+        parser.add_argument('--concurrency', default='1,2,4,8,16,32',
+                            help='comma separated devices uploading at the same time, one run per value')
+        parser.add_argument('--uploads', type=int, default=1,
+                            help='uploads per device on each run')
+        parser.add_argument('--resolution', default='640x360',
+                            help='width x height of each synthetic recording ( MJPEG/MKV as the devices record )')
+        parser.add_argument('--seconds', type=int, default=10,
+                            help='length of each synthetic recording')
+        parser.add_argument('--chunk-size', type=int, default=1024 * 1024)
+        parser.add_argument('--parallel', action='store_true',
+                            help='uses the parallel upload endpoints instead of the sequential ones')
+        parser.add_argument('--chunks-per-upload', type=int, default=4,
+                            help='concurrent chunks per device on parallel uploads')
+        parser.add_argument('--timeout', type=float, default=60)
+        parser.add_argument('--max-error-rate', type=float, default=0.05,
+                            help='stops increasing the concurrency once a run goes above it ( 0..1 )')
+        parser.add_argument('--device', type=int,
+                            help='completes the uploads as exam requests of this device ( needs --mac, --taker and --exercise )')
+        parser.add_argument('--mac', help='device mac address')
+        parser.add_argument('--taker', type=int)
+        parser.add_argument('--exercise', type=int)
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        try:
+            width, height = [int(size) for size in options['resolution'].lower().split('x')]
+        except ValueError:
+            raise CommandError("resolution must be like 640x360")
+        if not levels or min(levels) < 1 or options['chunk_size'] < 1 or options['seconds'] < 1 \
+                or width < 1 or height < 1:
+            raise CommandError("concurrency, resolution, seconds and chunk size must be positive")
+
+        complete_data = None
+        if options['device'] is not None:
+            if not options['mac'] or options['taker'] is None or options['exercise'] is None:
+                raise CommandError("--device needs --mac, --taker and --exercise")
+            complete_data = {
+                'device': options['device'],
+                'device_mac_address': options['mac'],
+                'taker': options['taker'],
+                'exercise': options['exercise'],
+                'duration': options['seconds'],
+            }
+
+        init_gstreamer()
+        load_test = UploadLoadTest(options['url'], options['chunk_size'],
+                                   width=width,
+                                   height=height,
+                                   seconds=options['seconds'],
+                                   parallel=options['parallel'],
+                                   chunks_per_upload=max(1, options['chunks_per_upload']),
+                                   complete_data=complete_data,
+                                   timeout=options['timeout'])
+
+        self.stdout.write("{devices:>8} {uploads:>8} {failed:>8} {throughput:>12} {p50:>10} {p99:>10} {errors:>8}".format(
+            devices='devices', uploads='uploads', failed='failed', throughput='MB/s', p50='p50 ms', p99='p99 ms',
+            errors='errors'))
+        for devices in levels:
+            report = load_test.run(devices, options['uploads']).get_report()
+            self.stdout.write("{devices:>8} {uploads:>8} {failed:>8} {throughput:>12.2f} {p50:>10.1f} {p99:>10.1f} "
+                              "{errors:>7.1%} {status_codes}".format(
+                                  devices=devices,
+                                  uploads=report['uploads'],
+                                  failed=report['failed_uploads'],
+                                  throughput=report['throughput'] / (1024 * 1024),
+                                  p50=report['p50'] * 1000,
+                                  p99=report['p99'] * 1000,
+                                  errors=report['error_rate'],
+                                  status_codes=report['status_codes']))
+            if report['error_rate'] > options['max_error_rate']:
+                self.stderr.write("error rate above {max_error_rate:.1%} with {devices} devices, stopping".format(
+                    max_error_rate=options['max_error_rate'],
+                    devices=devices))
+                break
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...processors import UploadReaper
+
+
+class Command(BaseCommand):
+    help = 'Removes stale uploads, orphaned raw videos and temp outputs, and reports the space reclaimed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=settings.UPLOAD_REAPER_TTL,
+                            help='seconds an upload / file must be untouched to be removed')
+        parser.add_argument('--batch-size', type=int, default=settings.UPLOAD_REAPER_BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='only reports what would be removed')
+
+    def handle(self, *args, **options):
+        report = UploadReaper(options['ttl'], max(1, options['batch_size']), settings.TRANSCODING_CLAIM_TIMEOUT,
+                              dry_run=options['dry_run']).reap()
+        for kind, (count, size) in report.items():
+            self.stdout.write("{kind}: {count} ( {size} bytes )".format(kind=kind, count=count, size=size))
+        self.stdout.write("total: {size} bytes{dry_run}".format(
+            size=sum(size for _, size in report.values()),
+            dry_run=' ( dry run )' if options['dry_run'] else ''))
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from multiprocessing import Process
+from ...processors import TranscodingWorker
+from ...video_utils import init_gstreamer
+
+
+def run_worker(poll_interval):
+    # GStreamer is initialized once per worker process, not once per pipeline
+    init_gstreamer()
+    TranscodingWorker().run_forever(poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Runs a long running transcoding daemon that claims and processes exam pending requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.EXAM_PENDING_REQUESTS_WORKERS,
+                            help='worker processes to run on this node')
+        parser.add_argument('--poll-interval', type=float, default=settings.TRANSCODING_POLL_INTERVAL,
+                            help='seconds to wait before polling again when the queue is empty')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+
+        self.stdout.write("starting {workers} transcoding workers".format(workers=workers))
+
+        if workers == 1:
+            run_worker(poll_interval)
+            return
+
+        # db connections can not be shared with forked processes, each worker opens its own
+        connections.close_all()
+        processes = [Process(target=run_worker, args=(poll_interval,)) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
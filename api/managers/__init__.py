@@ -1 +1,4 @@
-from .user_manager import UserManager
\ No newline at end of file
+from .user_manager import UserManager
+from .exam_pending_request_manager import ExamPendingRequestManager
+from .exam_video_manager import ExamVideoManager
+from .file_upload_manager import FileUploadManager
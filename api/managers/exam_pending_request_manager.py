@@ -0,0 +1,73 @@
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class ExamPendingRequestManager(models.Manager):
+
+    def claimable(self, claim_timeout):
+        """
+        not processed nor failed requests that are not claimed or whose claim expired ( worker died )
+        """
+        expired_claim = timezone.now() - timedelta(seconds=claim_timeout)
+        return self.filter(is_processed=False).exclude(status=self.model.FAILED).filter(Q(claimed_at__isnull=True) | Q(claimed_at__lt=expired_claim))
+
+    def in_progress(self, claim_timeout):
+        active_claim = timezone.now() - timedelta(seconds=claim_timeout)
+        return self.filter(is_processed=False, claimed_at__gte=active_claim).exclude(status=self.model.FAILED)
+
+    def schedule(self, claim_timeout):
+        """
+        claimable requests ids on processing order: by priority class, then round robin between devices
+        ( the n-th queued request of a device goes after the ( n - 1 )-th of every other device, counting
+        the ones the device has already in progress ), then by age
+        """
+        in_progress = {}
+        for device_id in self.in_progress(claim_timeout).values_list('device_id', flat=True):
+            in_progress[device_id] = in_progress.get(device_id, 0) + 1
+        queued = {}
+        schedule = []
+        for pending_exam in self.claimable(claim_timeout).order_by('created').values('id', 'priority', 'device_id',
+                                                                                        'created', 'duration'):
+            turn = in_progress.get(pending_exam['device_id'], 0) + queued.get((pending_exam['priority'],
+                                                                               pending_exam['device_id']), 0)
+            queued[(pending_exam['priority'], pending_exam['device_id'])] = \
+                queued.get((pending_exam['priority'], pending_exam['device_id']), 0) + 1
+            schedule.append((pending_exam['priority'], turn, pending_exam['created'], pending_exam['id'],
+                             pending_exam['duration']))
+        return [(pending_exam_id, duration) for _priority, _turn, _created, pending_exam_id, duration in sorted(schedule)]
+
+    def queue_positions(self, claim_timeout, seconds_per_second):
+        """
+        claimable request id -> ( position, eta in seconds ), the eta assumes that the workers now
+        processing requests keep going at seconds_per_second ( wall time per second of video )
+        """
+        workers = max(1, self.in_progress(claim_timeout).values('claimed_by').distinct().count())
+        positions = {}
+        pending_seconds = 0
+        for position, (pending_exam_id, duration) in enumerate(self.schedule(claim_timeout)):
+            pending_seconds += duration or 0
+            positions[pending_exam_id] = (position + 1, int(pending_seconds * seconds_per_second / workers))
+        return positions
+
+    def claim_next(self, worker, claim_timeout, exclude=()):
+        """
+        claims the next scheduled request for the given worker, rows locked by
+        other workers are skipped ( SELECT ... FOR UPDATE SKIP LOCKED ) so it is
+        safe to run several workers on several nodes, exclude are ids not to
+        claim ( ex: already postponed by this worker )
+        """
+        for pending_exam_id, _duration in self.schedule(claim_timeout):
+            if pending_exam_id in exclude:
+                continue
+            with transaction.atomic():
+                pending_exam = self.claimable(claim_timeout).select_for_update(skip_locked=True)\
+                    .filter(pk=pending_exam_id).first()
+                if pending_exam is None:
+                    # claimed or being claimed by other worker
+                    continue
+                pending_exam.claim(worker)
+                pending_exam.save()
+                return pending_exam
+        return None
@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+class ExamVideoManager(models.Manager):
+
+    def claim_next_lazy(self, claim_timeout):
+        """
+        claims the oldest requested lazy rendition, generations not finished after claim_timeout ( worker
+        died ) are claimed again
+        """
+        expired_claim = timezone.now() - timedelta(seconds=claim_timeout)
+        with transaction.atomic():
+            video = self.filter(Q(status=self.model.QUEUED) |
+                                Q(status=self.model.GENERATING, modified__lt=expired_claim))\
+                .select_for_update(skip_locked=True).order_by('modified').first()
+            if video is None:
+                return None
+            video.status = self.model.GENERATING
+            video.save(update_fields=['status', 'modified'])
+            return video
+
+    def evictable(self, max_idle):
+        """
+        generated lazy renditions not played during max_idle seconds, least recently played first
+        """
+        last_access = timezone.now() - timedelta(seconds=max_idle)
+        return self.filter(is_lazy=True, status=self.model.READY, last_access_at__lt=last_access)\
+            .order_by('last_access_at')
+
+    def cached_lazy(self):
+        # least recently played first
+        return self.filter(is_lazy=True, status=self.model.READY).order_by('last_access_at')
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from drf_chunked_upload.settings import EXPIRATION_DELTA
+
+
+class FileUploadManager(models.Manager):
+
+    def progressive_encoding(self, claim_timeout):
+        """
+        uploads being transcoded while they arrive by a live worker
+        """
+        active_claim = timezone.now() - timedelta(seconds=claim_timeout)
+        return self.filter(progressive_status=self.model.PROGRESSIVE_ENCODING, progressive_claimed_at__gte=active_claim)
+
+    def claim_next_progressive(self, worker, claim_timeout, min_bytes):
+        """
+        claims the oldest sequential matroska upload still in progress ( with at least min_bytes uploaded, so the
+        headers are there ) for progressive transcoding, claims not refreshed after claim_timeout are
+        claimed again
+        """
+        expired_claim = timezone.now() - timedelta(seconds=claim_timeout)
+        with transaction.atomic():
+            file_upload = self.filter(status=self.model.UPLOADING,
+                                      created_at__gt=timezone.now() - EXPIRATION_DELTA,
+                                      offset__gte=min_bytes,
+                                      chunk_size=0,
+                                      filename__iendswith='.mkv')\
+                .filter(Q(progressive_status=self.model.PROGRESSIVE_PENDING) |
+                        Q(progressive_status=self.model.PROGRESSIVE_ENCODING, progressive_claimed_at__lt=expired_claim))\
+                .select_for_update(skip_locked=True).order_by('created_at').first()
+            if file_upload is None:
+                return None
+            file_upload.claim_progressive(worker)
+            file_upload.save(update_fields=['progressive_status', 'progressive_claimed_by', 'progressive_claimed_at'])
+            return file_upload
+
+    def stale(self, ttl, claim_timeout):
+        """
+        uploads abandoned for ttl seconds: still incomplete, or completed but never turned on a request
+        ( the request creation failed ), the ones being transcoded while they arrive are left alone
+        """
+        created_before = timezone.now() - timedelta(seconds=ttl)
+        return self.filter(created_at__lt=created_before)\
+            .filter(Q(status=self.model.UPLOADING) | Q(status=self.model.COMPLETE, videos__isnull=True))\
+            .exclude(pk__in=self.progressive_encoding(claim_timeout).values('pk'))\
+            .distinct().order_by('created_at')
@@ -0,0 +1,23 @@
+# Generated by Django 2.0.3 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_auto_20190312_2140'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.0.3 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_exampendingrequest_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='exam',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='pending_exams_request', to='api.Exam'),
+        ),
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Queued'), (2, 'OGG Done'), (3, 'WEBM Done'), (4, 'MP4 Done'), (5, 'Stored'), (6, 'Failed')], default=1),
+        ),
+    ]
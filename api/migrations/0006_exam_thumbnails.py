@@ -0,0 +1,44 @@
+# Generated by Django 2.0.3 on 2026-10-18 12:10
+
+from django.db import migrations, models
+import storages.backends.gcloud
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_video_variant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='poster',
+            field=models.FileField(blank=True, null=True, storage=storages.backends.gcloud.GoogleCloudStorage(bucket_name=None), upload_to='videos'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='sprite',
+            field=models.FileField(blank=True, null=True, storage=storages.backends.gcloud.GoogleCloudStorage(bucket_name=None), upload_to='videos'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='sprite_columns',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='sprite_interval',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='sprite_tile_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='sprite_tile_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
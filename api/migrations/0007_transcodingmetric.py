@@ -0,0 +1,42 @@
+# Generated by Django 2.0.3 on 2026-10-18 12:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_exam_thumbnails'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscodingMetric',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('worker', models.CharField(blank=True, default='', max_length=255)),
+                ('attempt', models.PositiveSmallIntegerField(default=0)),
+                ('file_name', models.CharField(blank=True, default='', max_length=255)),
+                ('renditions', models.CharField(blank=True, default='', max_length=255)),
+                ('queue_wait', models.FloatField(blank=True, null=True)),
+                ('wall_time', models.FloatField(default=0)),
+                ('speed', models.FloatField(blank=True, null=True)),
+                ('decode_fps', models.FloatField(blank=True, null=True)),
+                ('encode_fps', models.FloatField(blank=True, null=True)),
+                ('stages', models.TextField(blank=True, default='')),
+                ('input_bytes', models.BigIntegerField(default=0)),
+                ('output_bytes', models.BigIntegerField(default=0)),
+                ('succeeded', models.BooleanField(default=True)),
+                ('final_message', models.TextField(blank=True, default='')),
+                ('pending_request', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transcoding_metrics', to='api.ExamPendingRequest')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.0.3 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_transcodingmetric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transcodingmetric',
+            name='preset',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
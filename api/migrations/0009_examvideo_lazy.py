@@ -0,0 +1,39 @@
+# Generated by Django 2.0.3 on 2026-10-18 14:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_transcodingmetric_preset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examvideo',
+            name='is_lazy',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='examvideo',
+            name='last_access_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='examvideo',
+            name='size',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='examvideo',
+            name='source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='derived_videos', to='api.ExamVideo'),
+        ),
+        migrations.AddField(
+            model_name='examvideo',
+            name='status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Ready'), (2, 'Lazy'), (3, 'Queued'), (4, 'Generating')], default=1),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.0.3 on 2026-10-18 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_examvideo_lazy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exampendingrequest',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'High'), (2, 'Normal'), (3, 'Low')], default=2),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.0.3 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_exampendingrequest_priority'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileupload',
+            name='expected_size',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
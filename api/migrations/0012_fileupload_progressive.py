@@ -0,0 +1,28 @@
+# Generated by Django 2.0.3 on 2026-10-18 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_fileupload_expected_size'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileupload',
+            name='progressive_status',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Pending'), (2, 'Encoding'), (3, 'Done'), (4, 'Failed')], default=1),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='progressive_claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='progressive_claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
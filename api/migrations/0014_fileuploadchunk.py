@@ -0,0 +1,40 @@
+# Generated by Django 2.0.3 on 2026-10-18 18:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import model_utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileupload',
+            name='chunk_size',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='FileUploadChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', model_utils.fields.AutoCreatedField(default=django.utils.timezone.now, editable=False, verbose_name='created')),
+                ('modified', model_utils.fields.AutoLastModifiedField(default=django.utils.timezone.now, editable=False, verbose_name='modified')),
+                ('index', models.PositiveIntegerField()),
+                ('size', models.BigIntegerField()),
+                ('md5', models.CharField(max_length=32)),
+                ('file_upload', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api.FileUpload')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='fileuploadchunk',
+            unique_together={('file_upload', 'index')},
+        ),
+    ]
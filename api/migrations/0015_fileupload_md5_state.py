@@ -0,0 +1,23 @@
+# Generated by Django 2.0.3 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_fileuploadchunk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fileupload',
+            name='md5_state',
+            field=models.BinaryField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='fileupload',
+            name='md5_checksum',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
@@ -4,11 +4,14 @@ from .user import User
 from .device import Device
 from .exercise import Exercise
 from .exam import Exam
+from .video import Video
 from .exam_video import ExamVideo
 from .device_users_group import DeviceUsersGroup
 from .device_broadcast import DeviceBroadCast
 from .news import News
 from .exam_pending_request import ExamPendingRequest
 from .exam_pending_request_video import ExamPendingRequestVideo
+from .transcoding_metric import TranscodingMetric
 from .file_upload import FileUpload
+from .file_upload_chunk import FileUploadChunk
 from .reset_password_request import ResetPasswordRequest
\ No newline at end of file
@@ -5,6 +5,8 @@ from ..validators import validate_duration
 from datetime import datetime
 from ..models import ModelValidationException
 from django.utils.translation import ugettext_lazy as _
+from storages.backends.gcloud import GoogleCloudStorage
+import os
 
 
 class Exam(TimeStampedModel):
@@ -18,6 +20,20 @@ class Exam(TimeStampedModel):
     eval_date = models.DateTimeField(null=True)
 
     video_views = models.IntegerField(default=0)
+
+    # poster frame and preview sprite ( seek bar thumbnails ), tile n covers [n * interval, (n + 1) * interval) seconds
+    poster = models.FileField(
+        storage=GoogleCloudStorage(bucket_name=os.getenv("GS_VIDEO_BUCKET_NAME")),
+        upload_to='videos', null=True, blank=True)
+
+    sprite = models.FileField(
+        storage=GoogleCloudStorage(bucket_name=os.getenv("GS_VIDEO_BUCKET_NAME")),
+        upload_to='videos', null=True, blank=True)
+
+    sprite_interval = models.PositiveIntegerField(null=True, blank=True)
+    sprite_columns = models.PositiveIntegerField(null=True, blank=True)
+    sprite_tile_width = models.PositiveIntegerField(null=True, blank=True)
+    sprite_tile_height = models.PositiveIntegerField(null=True, blank=True)
     # relations
 
     taker = models.ForeignKey(settings.AUTH_USER_MODEL,
@@ -92,3 +108,9 @@ class Exam(TimeStampedModel):
         self.evaluated = True
         self.notes = notes or ''
         self.eval_date = datetime.utcnow()
+
+    def set_sprite(self, interval, columns, tile_width, tile_height):
+        self.sprite_interval = interval
+        self.sprite_columns = columns
+        self.sprite_tile_width = tile_width
+        self.sprite_tile_height = tile_height
@@ -1,9 +1,40 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from model_utils.models import TimeStampedModel
+from ..managers.exam_pending_request_manager import ExamPendingRequestManager
 
 
 class ExamPendingRequest(TimeStampedModel):
+    # transcoding steps, renditions are done in this order so a restarted
+    # worker resumes from the last finished one
+    QUEUED = 1
+    OGG_DONE = 2
+    WEBM_DONE = 3
+    MP4_DONE = 4
+    STORED = 5
+    FAILED = 6
+
+    STATUS_CHOICES = (
+        (QUEUED, 'Queued'),
+        (OGG_DONE, 'OGG Done'),
+        (WEBM_DONE, 'WEBM Done'),
+        (MP4_DONE, 'MP4 Done'),
+        (STORED, 'Stored'),
+        (FAILED, 'Failed'),
+    )
+
+    # scheduling classes, lower goes first
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+    PRIORITY_CHOICES = (
+        (HIGH, 'High'),
+        (NORMAL, 'Normal'),
+        (LOW, 'Low'),
+    )
+
     duration = models.IntegerField(blank=True, null=True)
     # relations
 
@@ -21,6 +52,22 @@ class ExamPendingRequest(TimeStampedModel):
 
     is_processed = models.BooleanField(default=False)
 
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=NORMAL)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+
+    # exam created once the request is stored
+    exam = models.ForeignKey("Exam",
+                             null=True, blank=True, on_delete=models.SET_NULL,
+                             related_name="pending_exams_request")
+
+    # transcoding worker that is currently processing the request
+    claimed_by = models.CharField(max_length=255, null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ExamPendingRequestManager()
+
     def set_taker(self, user):
         self.taker = user
         self.save()
@@ -31,5 +78,45 @@ class ExamPendingRequest(TimeStampedModel):
         self.save()
         return self
 
+    @staticmethod
+    def get_default_priority(exercise):
+        # tutorials are auto approved, nobody is waiting for them
+        if exercise is not None and exercise.is_tutorial():
+            return ExamPendingRequest.LOW
+        return ExamPendingRequest.NORMAL
+
+    def set_priority(self, priority):
+        self.priority = priority
+        self.save(update_fields=['priority', 'modified'])
+        return self
+
     def mark_as_processed(self):
         self.is_processed = True
+        self.status = ExamPendingRequest.STORED
+
+    def mark_as_failed(self, error, max_attempts):
+        """
+        records the error, the request is retried while it has attempts left
+        """
+        self.last_error = error
+        if self.attempts >= max_attempts:
+            self.status = ExamPendingRequest.FAILED
+
+    def is_failed(self):
+        return self.status == ExamPendingRequest.FAILED
+
+    def claim(self, worker):
+        self.claimed_by = worker
+        self.claimed_at = timezone.now()
+        self.attempts = self.attempts + 1
+
+    def postpone(self):
+        """
+        gives the claim back without consuming an attempt ( ex: no resources to process it now )
+        """
+        self.release_claim()
+        self.attempts = max(0, self.attempts - 1)
+
+    def release_claim(self):
+        self.claimed_by = None
+        self.claimed_at = None
@@ -16,6 +16,9 @@ class ExamPendingRequestVideo(TimeStampedModel):
     file_upload = models.ForeignKey("FileUpload", null=True, on_delete=models.SET_NULL,
                                 related_name="videos")
 
+    # see FileUpload.content_hash, kept once the upload is gone
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+
     def set_request(self, request):
         self.request = request
         self.save()
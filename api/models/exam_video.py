@@ -1,9 +1,37 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from .video import Video
+from ..managers.exam_video_manager import ExamVideoManager
 
 
 class ExamVideo(Video):
+    # lazy renditions are generated from the source one the first time they are requested
+    READY = 1
+    LAZY = 2
+    QUEUED = 3
+    GENERATING = 4
+
+    STATUS_CHOICES = (
+        (READY, 'Ready'),
+        (LAZY, 'Lazy'),
+        (QUEUED, 'Queued'),
+        (GENERATING, 'Generating'),
+    )
+
+    status = models.PositiveSmallIntegerField(choices=STATUS_CHOICES, default=READY)
+    # generated on demand, evicted once it is not played for a while
+    is_lazy = models.BooleanField(default=False)
+    # rendition the lazy one is generated from
+    source = models.ForeignKey("self",
+                               null=True, blank=True, on_delete=models.SET_NULL,
+                               related_name="derived_videos")
+    last_access_at = models.DateTimeField(null=True, blank=True)
+    # bytes
+    size = models.BigIntegerField(null=True, blank=True)
+    # content hash of the recording it was encoded from ( see FileUpload.content_hash )
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+
     # relations
 
     exam = models.ForeignKey("Exam",
@@ -12,6 +40,35 @@ class ExamVideo(Video):
 
     shares = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True)
 
+    objects = ExamVideoManager()
+
     def set_exam(self, exam):
         self.exam = exam
-        self.save()
\ No newline at end of file
+        self.save()
+
+    def is_ready(self):
+        return self.status == ExamVideo.READY
+
+    def request_generation(self):
+        """
+        queues a lazy rendition, returns True if it was not generated nor queued yet
+        """
+        if self.status != ExamVideo.LAZY:
+            return False
+        self.status = ExamVideo.QUEUED
+        self.save(update_fields=['status', 'modified'])
+        return True
+
+    def mark_as_generated(self, size):
+        self.status = ExamVideo.READY
+        self.size = size
+        self.last_access_at = timezone.now()
+
+    def mark_as_evicted(self):
+        self.status = ExamVideo.LAZY
+        self.file.name = ''
+        self.size = None
+
+    def touch(self):
+        self.last_access_at = timezone.now()
+        ExamVideo.objects.filter(pk=self.pk).update(last_access_at=self.last_access_at)
@@ -1,7 +1,279 @@
+import hashlib
+import os
+from django.core.files.base import ContentFile
+from django.db import models
+from django.db.models import Sum
+from django.utils import timezone
 from drf_chunked_upload.models import ChunkedUpload
+from ..managers.file_upload_manager import FileUploadManager
+from ..utils.resumable_hash import ResumableHash
 
 
 class FileUpload(ChunkedUpload):
-    pass
+    # progressive transcoding, while the upload is still arriving ( see ProgressiveUploadProcessor )
+    PROGRESSIVE_PENDING = 1
+    PROGRESSIVE_ENCODING = 2
+    PROGRESSIVE_DONE = 3
+    PROGRESSIVE_FAILED = 4
+
+    PROGRESSIVE_STATUS_CHOICES = (
+        (PROGRESSIVE_PENDING, 'Pending'),
+        (PROGRESSIVE_ENCODING, 'Encoding'),
+        (PROGRESSIVE_DONE, 'Done'),
+        (PROGRESSIVE_FAILED, 'Failed'),
+    )
+
+    CONTENT_HASH_ALGORITHM = 'sha256'
+
+    # total size announced by the client ( Content-Range ), used to reserve disk space while uploading
+    expected_size = models.BigIntegerField(default=0)
+    # parallel uploads ( chunks sent concurrently and in any order, see FileUploadChunk ), 0 for sequential ones
+    chunk_size = models.BigIntegerField(default=0)
+
+    progressive_status = models.PositiveSmallIntegerField(choices=PROGRESSIVE_STATUS_CHOICES,
+                                                          default=PROGRESSIVE_PENDING)
+    progressive_claimed_by = models.CharField(max_length=255, null=True, blank=True)
+    progressive_claimed_at = models.DateTimeField(null=True, blank=True)
+
+    # hash of the uploaded bytes, computed as chunks arrive ( see ResumableHash ), used to spot re uploads
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    # None if some chunk could not be hashed, the file is then read again on completion
+    content_hash_state = models.BinaryField(null=True, editable=False)
+    # md5 of the uploaded bytes, checked against the client one on completion, same as content_hash_state
+    md5_state = models.BinaryField(null=True, editable=False)
+    md5_checksum = models.CharField(max_length=32, blank=True, default='')
+
+    objects = FileUploadManager()
+
+    def set_expected_size(self, expected_size):
+        self.expected_size = expected_size
+        self.save(update_fields=['expected_size'])
+        return self
+
+    def is_parallel(self):
+        return self.chunk_size > 0
+
+    @staticmethod
+    def stores_parts():
+        """
+        chunks are kept as separated objects and composed on completion ( see ComposableGoogleCloudStorage )
+        instead of appended to a local file
+        """
+        return hasattr(FileUpload._meta.get_field('file').storage, 'compose')
+
+    def get_chunks_count(self):
+        return (self.expected_size + self.chunk_size - 1) // self.chunk_size
+
+    def get_chunk_size(self, index):
+        # the last one holds the remainder
+        return min(self.chunk_size, self.expected_size - index * self.chunk_size)
+
+    def get_chunk_name(self, index):
+        return "{base_name}_chunks/{index:06d}".format(base_name=os.path.splitext(self.file.name)[0], index=index)
+
+    def get_missing_chunks(self):
+        received = set(self.chunks.values_list('index', flat=True))
+        return [index for index in range(self.get_chunks_count()) if index not in received]
+
+    def _save_part(self, index, chunk):
+        storage = self.file.storage
+        chunk_name = self.get_chunk_name(index)
+        if storage.exists(chunk_name):
+            storage.delete(chunk_name)
+        storage.save(chunk_name, chunk)
+
+    def _delete_parts(self):
+        storage = self.file.storage
+        chunks_folder = os.path.dirname(self.get_chunk_name(0))
+        try:
+            _, names = storage.listdir(chunks_folder)
+        except FileNotFoundError:
+            return
+        for name in names:
+            storage.delete(os.path.join(chunks_folder, name))
+
+    def save_chunk(self, index, chunk, md5):
+        """
+        stores a received chunk, a retried one replaces the previous copy
+        """
+        self._save_part(index, chunk)
+        self.chunks.update_or_create(index=index, defaults={'size': chunk.size, 'md5': md5})
+        # received bytes, so the disk space monitor knows what is left
+        self.offset = self.chunks.aggregate(size=Sum('size'))['size'] or 0
+        FileUpload.objects.filter(pk=self.pk).update(offset=self.offset)
+
+    def assemble_chunks(self):
+        """
+        concatenates the chunks on the upload file, hashing it on the way so completing it does not read it again
+        the chunks are kept until the upload is completed ( see delete_chunks / discard_assembled )
+        """
+        storage = self.file.storage
+        if self.stores_parts():
+            # composed by the storage, then read back once so the client md5 is checked against the composed
+            # object ( the per chunk ones do not catch parts composed on a wrong order )
+            storage.compose([self.get_chunk_name(index) for index in range(self.get_chunks_count())], self.file.name)
+            content_hash = ResumableHash(FileUpload.CONTENT_HASH_ALGORITHM) if ResumableHash.is_supported() else None
+            md5 = hashlib.md5()
+            with storage.open(self.file.name, 'rb') as composed:
+                for data in composed.chunks():
+                    md5.update(data)
+                    if content_hash is not None:
+                        content_hash.update(data)
+            self.offset = self.expected_size
+            self.content_hash_state = content_hash.get_state() if content_hash is not None else None
+            self.md5_state = None
+            self._md5 = md5.hexdigest()
+            self.save()
+            return
+        content_hash = ResumableHash(FileUpload.CONTENT_HASH_ALGORITHM) if ResumableHash.is_supported() else None
+        md5 = hashlib.md5()
+        self.close_file()
+        self.file.open(mode='wb')
+        for index in range(self.get_chunks_count()):
+            with storage.open(self.get_chunk_name(index), 'rb') as chunk:
+                for data in chunk.chunks():
+                    self.file.write(data)
+                    md5.update(data)
+                    if content_hash is not None:
+                        content_hash.update(data)
+        self.close_file()
+        self.offset = self.expected_size
+        self.content_hash_state = content_hash.get_state() if content_hash is not None else None
+        self._md5 = md5.hexdigest()
+        self.save()
+
+    def delete_chunks(self):
+        self._delete_parts()
+        self.chunks.all().delete()
+
+    def discard_assembled(self):
+        """
+        the assembled file did not match the client md5, it is emptied and the chunks are kept, so only
+        the bad ones are sent again before completing it again
+        """
+        storage = self.file.storage
+        self.close_file()
+        storage.delete(self.file.name)
+        storage.save(self.file.name, ContentFile(b''))
+        self.offset = self.chunks.aggregate(size=Sum('size'))['size'] or 0
+        self.content_hash_state = None
+        self._md5 = None
+        self.save()
+
+    def _update_hashes(self, chunk, content_hash_state, md5_state):
+        # states saved by other libcrypto version are dropped, the hashes are computed on a full read instead
+        content_hash = ResumableHash(FileUpload.CONTENT_HASH_ALGORITHM, content_hash_state) \
+            if ResumableHash.is_valid_state(FileUpload.CONTENT_HASH_ALGORITHM, content_hash_state) else None
+        md5 = ResumableHash('md5', md5_state) if ResumableHash.is_valid_state('md5', md5_state) else None
+        if content_hash is None and md5 is None:
+            return
+        # a single pass over the chunk for both hashes
+        for data in chunk.chunks():
+            if content_hash is not None:
+                content_hash.update(data)
+            if md5 is not None:
+                md5.update(data)
+        self.content_hash_state = content_hash.get_state() if content_hash is not None else None
+        self.md5_state = md5.get_state() if md5 is not None else None
+
+    def start_hashes(self, chunk):
+        """
+        chunk is the first one ( an UploadedFile )
+        """
+        if not ResumableHash.is_supported():
+            return
+        self._update_hashes(chunk, ResumableHash(FileUpload.CONTENT_HASH_ALGORITHM).get_state(),
+                            ResumableHash('md5').get_state())
+
+    def append_chunk(self, chunk, chunk_size=None, save=True):
+        self._update_hashes(chunk, self.content_hash_state, self.md5_state)
+        if not self.stores_parts():
+            super().append_chunk(chunk, chunk_size=chunk_size, save=save)
+            return
+        # object storages can not append, every chunk is a part ( the first one is the upload file itself )
+        index = self.chunks.count() + 1
+        self._save_part(index, chunk)
+        self.chunks.create(index=index, size=chunk.size, md5='')
+        self.offset += chunk_size if chunk_size is not None else chunk.size
+        self._md5 = None
+        if save:
+            self.save()
+
+    def compose_parts(self):
+        """
+        sequential uploads on a composable storage, the upload file plus its parts
+        """
+        if self.is_parallel():
+            # already composed by assemble_chunks
+            return
+        indexes = list(self.chunks.order_by('index').values_list('index', flat=True))
+        if not indexes:
+            return
+        self.file.storage.compose([self.file.name] + [self.get_chunk_name(index) for index in indexes],
+                                  self.file.name)
+        self._delete_parts()
+        self.chunks.all().delete()
+
+    @property
+    def md5(self):
+        # ChunkedUpload.md5 reads the whole file again, the hash state kept on append_chunk is used instead
+        if getattr(self, '_md5', None) is None and ResumableHash.is_valid_state('md5', self.md5_state):
+            self._md5 = ResumableHash('md5', self.md5_state).hexdigest()
+        if getattr(self, '_md5', None) is None:
+            if self.stores_parts():
+                self.compose_parts()
+            return ChunkedUpload.md5.fget(self)
+        return self._md5
+
+    def get_content_hash(self):
+        if ResumableHash.is_valid_state(FileUpload.CONTENT_HASH_ALGORITHM, self.content_hash_state):
+            return ResumableHash(FileUpload.CONTENT_HASH_ALGORITHM, self.content_hash_state).hexdigest()
+        if self.stores_parts():
+            # computed by the worker while downloading it
+            return ''
+        content_hash = hashlib.new(FileUpload.CONTENT_HASH_ALGORITHM)
+        self.close_file()
+        self.file.open(mode='rb')
+        for data in self.file.chunks():
+            content_hash.update(data)
+        self.close_file()
+        return content_hash.hexdigest()
+
+    def completed(self, *args, **kwargs):
+        if not self.stores_parts():
+            self.content_hash = self.get_content_hash()
+            self.md5_checksum = self.md5
+            super().completed(*args, **kwargs)
+            return
+        self.compose_parts()
+        self.content_hash = self.get_content_hash()
+        if self.md5_state is not None or getattr(self, '_md5', None) is not None:
+            self.md5_checksum = self.md5
+        # object storages can not rename, the file keeps its incomplete extension
+        self.status = self.COMPLETE
+        self.completed_at = timezone.now()
+        self.save()
+
+    def delete_file(self):
+        # ChunkedUpload.delete_file uses file.path, which object storages do not have
+        if self.file:
+            if self.stores_parts():
+                self._delete_parts()
+            self.file.storage.delete(self.file.name)
+        self.file = None
+
+    def claim_progressive(self, worker):
+        self.progressive_status = FileUpload.PROGRESSIVE_ENCODING
+        self.progressive_claimed_by = worker
+        self.progressive_claimed_at = timezone.now()
+
+    def mark_progressive_as_done(self):
+        self.progressive_status = FileUpload.PROGRESSIVE_DONE
+
+    def mark_progressive_as_failed(self):
+        self.progressive_status = FileUpload.PROGRESSIVE_FAILED
+
+    def is_progressive_done(self):
+        return self.progressive_status == FileUpload.PROGRESSIVE_DONE
 # Override the default ChunkedUpload to make the `user` field nullable
-FileUpload._meta.get_field('user').null = True
\ No newline at end of file
+FileUpload._meta.get_field('user').null = True
@@ -0,0 +1,16 @@
+from django.db import models
+from model_utils.models import TimeStampedModel
+
+
+class FileUploadChunk(TimeStampedModel):
+    """
+    chunk received on a parallel upload ( see FileUpload.chunk_size ), stored apart until the upload is assembled
+    """
+
+    file_upload = models.ForeignKey("FileUpload", on_delete=models.CASCADE, related_name="chunks")
+    index = models.PositiveIntegerField()
+    size = models.BigIntegerField()
+    md5 = models.CharField(max_length=32)
+
+    class Meta:
+        unique_together = (('file_upload', 'index'),)
@@ -0,0 +1,73 @@
+from django.db import models
+from django.db.models import Sum, Max
+from model_utils.models import TimeStampedModel
+import json
+
+
+class TranscodingMetric(TimeStampedModel):
+    """
+    telemetry of a single transcoding pipeline run ( one source file, one or more renditions )
+    """
+
+    pending_request = models.ForeignKey("ExamPendingRequest",
+                                        null=True, on_delete=models.CASCADE,
+                                        related_name="transcoding_metrics")
+
+    worker = models.CharField(max_length=255, blank=True, default='')
+    attempt = models.PositiveSmallIntegerField(default=0)
+    file_name = models.CharField(max_length=255, blank=True, default='')
+    renditions = models.CharField(max_length=255, blank=True, default='')
+    # encoder preset name
+    preset = models.CharField(max_length=50, blank=True, default='')
+
+    # seconds since the request was created until this attempt was claimed
+    queue_wait = models.FloatField(null=True, blank=True)
+    # seconds from PLAYING to the final bus message
+    wall_time = models.FloatField(default=0)
+    # source duration ( seconds ) / wall time, > 1 is faster than real time
+    speed = models.FloatField(null=True, blank=True)
+    decode_fps = models.FloatField(null=True, blank=True)
+    # slowest encoder, it bounds the whole single pass pipeline
+    encode_fps = models.FloatField(null=True, blank=True)
+    # json, fps per decoder/encoder element
+    stages = models.TextField(blank=True, default='')
+
+    input_bytes = models.BigIntegerField(default=0)
+    output_bytes = models.BigIntegerField(default=0)
+
+    succeeded = models.BooleanField(default=True)
+    # EOS element or error
+    final_message = models.TextField(blank=True, default='')
+
+    def set_stats(self, stats, duration=None):
+        """
+        stats as collected by AbstractTranscoder.collect_stats
+        """
+        self.wall_time = stats['wall_time']
+        self.input_bytes = stats['input_bytes']
+        self.output_bytes = stats['output_bytes']
+        self.final_message = stats['final_message']
+        self.stages = json.dumps(stats['fps'], sort_keys=True)
+        decoders = [fps for name, fps in stats['fps'].items() if 'dec' in name]
+        encoders = [fps for name, fps in stats['fps'].items() if 'enc' in name]
+        self.decode_fps = max(decoders) if decoders else None
+        self.encode_fps = min(encoders) if encoders else None
+        if duration and self.wall_time > 0:
+            self.speed = duration / self.wall_time
+
+    @staticmethod
+    def get_seconds_per_second(samples=50, default=1.0):
+        """
+        transcoding wall time per second of video of the last processed requests
+        """
+        requests = TranscodingMetric.objects.filter(succeeded=True, pending_request__duration__gt=0)\
+            .values('pending_request').annotate(wall_time=Sum('wall_time'), duration=Max('pending_request__duration'))\
+            .order_by('-pending_request')[:samples]
+        wall_time = sum(request['wall_time'] for request in requests)
+        duration = sum(request['duration'] for request in requests)
+        if duration <= 0:
+            return default
+        return wall_time / duration
+
+    def get_stages(self):
+        return json.loads(self.stages) if self.stages else {}
@@ -6,6 +6,16 @@ from storages.backends.gcloud import GoogleCloudStorage
 import os
 
 class Video(TimeStampedModel):
+    # types
+    OGG = 'video/ogg'
+    WEBM = 'video/webm'
+    MP4 = 'video/mp4'
+    # segmented, file is the playlist/manifest and segments are stored next to it
+    HLS = 'application/x-mpegURL'
+    DASH = 'application/dash+xml'
+
+    STREAMING_TYPES = (HLS, DASH)
+
     description = models.TextField()
 
     type = models.TextField()
@@ -18,8 +28,24 @@ class Video(TimeStampedModel):
 
     views = models.IntegerField(default=0)
 
+    # bitrate ladder variant, empty for the source resolution rendition
+    variant = models.CharField(max_length=50, blank=True, default='')
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # kbps
+    bitrate = models.PositiveIntegerField(null=True, blank=True)
+
     # relations
 
     author = models.ForeignKey(settings.AUTH_USER_MODEL,
                                null=True, on_delete=models.SET_NULL,
                                related_name="created_videos")
+
+    def is_streaming(self):
+        return self.type in Video.STREAMING_TYPES
+
+    def set_variant(self, variant, width, height, bitrate):
+        self.variant = variant
+        self.width = width
+        self.height = height
+        self.bitrate = bitrate
@@ -0,0 +1,5 @@
+from .exam_pending_request_processor import ExamPendingRequestProcessor
+from .lazy_rendition_processor import LazyRenditionProcessor
+from .progressive_upload_processor import ProgressiveUploadProcessor
+from .transcoding_worker import TranscodingWorker, run_transcoding_worker_until_empty
+from .upload_reaper import UploadReaper
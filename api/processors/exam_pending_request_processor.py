@@ -0,0 +1,703 @@
+from ..models import Exam, ExamVideo, ExamPendingRequest, Video, TranscodingMetric, FileUpload
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+import hashlib
+import os
+import shutil
+import logging
+from collections import namedtuple
+from ..video_utils import MKV2MultiTranscoder, StorageStreamUploader, write_hls_master_playlist, MediaProbe, \
+    SegmentsJoinTranscoder, \
+    get_thumbnail_files, build_poster, build_sprite_sheet
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from django.utils.translation import ugettext_lazy as _
+from django.db import transaction
+
+# name, mime type, request status once the rendition is done, packaged output name, ladder variant
+# packaged renditions ( segments + playlist/manifest on a folder ) are encoded along with the mp4 one
+Rendition = namedtuple('Rendition', ['name', 'type', 'status', 'packaged_name', 'variant'])
+
+
+class ExamPendingRequestProcessor:
+    """
+    transcodes all the videos of an ExamPendingRequest and turns it on an Exam
+    progress is saved on the request status after each finished step, so a
+    restarted worker resumes from the last one instead of encoding again
+    transcoding runs outside of any transaction, the Exam/ExamVideo rows are
+    created on a single transaction per exam so they are committed as soon as
+    the exam is done
+    """
+
+    RENDITIONS = (
+        Rendition('ogg', Video.OGG, ExamPendingRequest.OGG_DONE, None, None),
+        Rendition('webm', Video.WEBM, ExamPendingRequest.WEBM_DONE, None, None),
+        Rendition('mp4', Video.MP4, ExamPendingRequest.MP4_DONE, None, None),
+        Rendition('hls', Video.HLS, ExamPendingRequest.MP4_DONE, 'playlist.m3u8', None),
+        Rendition('dash', Video.DASH, ExamPendingRequest.MP4_DONE, 'manifest.mpd', None),
+    )
+
+    HLS_MASTER_PLAYLIST = 'master.m3u8'
+
+    POSTER_FILE = 'poster.jpg'
+    SPRITE_FILE = 'sprite.jpg'
+
+    def __init__(self):
+        self.logger = logging.getLogger('cronjobs')
+        self.storage = ExamVideo._meta.get_field('file').storage
+        # encoded bytes go straight to the video bucket instead of the local disk
+        self.stream_upload = settings.TRANSCODING_STREAM_UPLOAD and StorageStreamUploader.is_supported(self.storage)
+        self.probe = MediaProbe(cache=cache, timeout=settings.MEDIA_PROBE_TIMEOUT,
+                                cache_timeout=settings.MEDIA_PROBE_CACHE_TIMEOUT)
+        # probed MediaInfo of the request being processed, by file name
+        self.media_infos = {}
+        # content hash of the videos of the request being processed, by file name
+        self.content_hashes = {}
+        # ladder variants of the request being processed, see get_variants
+        self.variants = settings.EXAM_VIDEO_LADDER
+        self.renditions = self.get_renditions()
+        self.thumbnails_enabled = settings.EXAM_VIDEO_THUMBNAILS_ENABLED
+        # encoder preset of the request being processed, see get_encoder_preset
+        self.preset = settings.TRANSCODING_ENCODER_PRESET
+
+    def get_lazy_renditions(self):
+        """
+        renditions generated on demand from the mp4 one ( see LazyRenditionProcessor )
+        """
+        return [rendition for rendition in self.RENDITIONS
+                if rendition.name in settings.EXAM_VIDEO_LAZY_RENDITIONS and rendition.name in ('ogg', 'webm')]
+
+    def get_renditions(self):
+        renditions = []
+        lazy_renditions = self.get_lazy_renditions()
+        for rendition in self.RENDITIONS:
+            if rendition in lazy_renditions:
+                continue
+            if rendition.name == 'hls' and not settings.EXAM_VIDEO_HLS_ENABLED:
+                continue
+            if rendition.name == 'dash' and not settings.EXAM_VIDEO_DASH_ENABLED:
+                continue
+            renditions.append(rendition)
+        # bitrate ladder, an extra mp4 ( and hls variant playlist ) per variant
+        for variant in self.variants:
+            renditions.append(Rendition('mp4_' + variant['name'], Video.MP4, ExamPendingRequest.MP4_DONE, None, variant))
+        return renditions
+
+    def get_variants(self):
+        """
+        ladder variants taller than the source are skipped, upscaling only wastes bits
+        """
+        heights = [media_info.height for media_info in self.media_infos.values() if media_info.height]
+        if not heights:
+            return settings.EXAM_VIDEO_LADDER
+        return [variant for variant in settings.EXAM_VIDEO_LADDER if variant['height'] <= min(heights)]
+
+    def probe_videos(self, pending_videos, file_names):
+        media_infos = {}
+        for pending_video, file_name in zip(pending_videos, file_names):
+            try:
+                media_infos[file_name] = self.probe.probe(file_name,
+                                                          key=pending_video.content_hash or pending_video.file_upload_id)
+            except Exception as exc:
+                # transcoding goes on with the defaults, a broken file fails there anyway
+                self.logger.warning("ExamPendingRequestProcessor - can not probe {tmp_name}: {error}".format(
+                    tmp_name=file_name,
+                    error=exc))
+        return media_infos
+
+    def verify_duration(self, pending_exam):
+        """
+        the duration sent by the device is filled or fixed with the probed one, unless some file has
+        no probed duration ( matroska without a Duration element ), the device one is kept then
+        """
+        if not self.media_infos or any(not media_info.duration or media_info.duration <= 0
+                                       for media_info in self.media_infos.values()):
+            return
+        duration = int(round(sum(media_info.duration for media_info in self.media_infos.values())))
+        if pending_exam.duration is not None and \
+                abs(pending_exam.duration - duration) <= settings.MEDIA_PROBE_DURATION_TOLERANCE:
+            return
+        self.logger.warning("ExamPendingRequestProcessor - request {id} duration {duration} probed {probed}".format(
+            id=pending_exam.id,
+            duration=pending_exam.duration,
+            probed=duration))
+        pending_exam.duration = duration
+        pending_exam.save(update_fields=['duration', 'modified'])
+
+    def get_rendition(self, rendition):
+        for item in self.renditions:
+            if item.name == rendition:
+                return item
+        return None
+
+    def is_packaged(self, rendition):
+        return self.get_rendition(rendition).packaged_name is not None
+
+    def has_hls_variants(self):
+        return self.get_rendition('hls') is not None and len(self.variants) > 0
+
+    def is_streamed(self, rendition):
+        # segmented outputs are always written to disk and uploaded once packaged, webm too: streamable
+        # webmmux writes neither duration nor cues, so players could not seek on it
+        return self.stream_upload and not self.is_packaged(rendition) and rendition != 'webm'
+
+    def get_output_file(self, file_name, rendition):
+        # outputs live next to the source, so they survive a worker restart
+        base_name = os.path.splitext(file_name)[0]
+        item = self.get_rendition(rendition)
+        if item.packaged_name is not None:
+            return os.path.join(base_name + '_' + rendition, item.packaged_name)
+        if item.variant is not None:
+            return base_name + '_' + item.variant['name'] + '.' + rendition.split('_')[0]
+        return base_name + '.' + rendition
+
+    def get_hls_variant_file(self, file_name, variant):
+        # variant playlists live under the main hls folder, next to the master one
+        return os.path.join(os.path.dirname(self.get_output_file(file_name, 'hls')), variant['name'], 'playlist.m3u8')
+
+    def get_hls_master_file(self, file_name):
+        return os.path.join(os.path.dirname(self.get_output_file(file_name, 'hls')), self.HLS_MASTER_PLAYLIST)
+
+    def get_encoder_preset(self, pending_exam):
+        """
+        a deep enough queue picks a faster preset so the backlog drains, otherwise
+        the exercise type one, otherwise the default one
+        """
+        preset = settings.TRANSCODING_ENCODER_PRESET
+        if pending_exam.exercise is not None:
+            preset = settings.TRANSCODING_ENCODER_PRESETS_BY_EXERCISE_TYPE.get(
+                pending_exam.exercise.get_type_display().lower(), preset)
+        if settings.TRANSCODING_ENCODER_PRESETS_BY_QUEUE_DEPTH:
+            queue_depth = ExamPendingRequest.objects.claimable(settings.TRANSCODING_CLAIM_TIMEOUT).count()
+            for min_queue_depth, queue_preset in settings.TRANSCODING_ENCODER_PRESETS_BY_QUEUE_DEPTH:
+                if queue_depth >= min_queue_depth:
+                    preset = queue_preset
+        return preset
+
+    @staticmethod
+    def set_watchdog(transcoder, duration):
+        # stalled pipelines ( ex: corrupt sources that never reach EOS ) or running past the budget are aborted
+        transcoder.set_watchdog(settings.TRANSCODING_WATCHDOG_STALL_TIMEOUT,
+                                duration=duration,
+                                budget_factor=settings.TRANSCODING_WATCHDOG_BUDGET_FACTOR,
+                                min_budget=settings.TRANSCODING_WATCHDOG_MIN_BUDGET)
+        return transcoder
+
+    def get_thumbnails_folder(self, file_name):
+        return os.path.splitext(file_name)[0] + '_thumbnails'
+
+    def get_segments_folder(self, file_name):
+        return os.path.splitext(file_name)[0] + '_segments'
+
+    def get_thumbnails_options(self):
+        return {
+            'interval': settings.EXAM_VIDEO_THUMBNAILS_INTERVAL,
+            'width': settings.EXAM_VIDEO_POSTER_SIZE[0],
+            'height': settings.EXAM_VIDEO_POSTER_SIZE[1],
+        }
+
+    def get_segments_count(self, duration, remux):
+        """
+        long exams are split on this many segments encoded in parallel, 1 means a single pipeline
+        """
+        if remux or settings.TRANSCODING_PARALLEL_SEGMENTS <= 1:
+            return 1
+        if not duration or duration < settings.TRANSCODING_PARALLEL_MIN_DURATION:
+            return 1
+        return settings.TRANSCODING_PARALLEL_SEGMENTS
+
+    def get_storage_name(self, file_name, rendition):
+        output_file = Path(self.get_output_file(file_name, rendition))
+        if self.is_packaged(rendition):
+            return ExamVideo._meta.get_field('file').generate_filename(None, output_file.parent.name + '/' + output_file.name)
+        return ExamVideo._meta.get_field('file').generate_filename(None, output_file.name)
+
+    def rendition_exists(self, file_name, rendition):
+        if rendition == 'hls' and self.has_hls_variants():
+            # written once all the variant playlists are done
+            return os.path.exists(self.get_hls_master_file(file_name))
+        if self.is_streamed(rendition):
+            return self.storage.exists(self.get_storage_name(file_name, rendition))
+        return os.path.exists(self.get_output_file(file_name, rendition))
+
+    def set_status(self, pending_exam, status):
+        pending_exam.status = status
+        pending_exam.save(update_fields=['status', 'modified'])
+        self.logger.info("ExamPendingRequestProcessor - request {id} status {status}".format(
+            id=pending_exam.id,
+            status=pending_exam.get_status_display()))
+
+    def transcode(self, pending_exam, file_name, renditions):
+        output_files = {}
+        uploaders = {}
+        for rendition in renditions:
+            if self.is_streamed(rendition):
+                uploaders[rendition] = StorageStreamUploader(self.storage,
+                                                             self.get_storage_name(file_name, rendition),
+                                                             self.get_rendition(rendition).type,
+                                                             settings.TRANSCODING_STREAM_UPLOAD_CHUNK_SIZE)
+                continue
+            output_files[rendition] = self.get_output_file(file_name, rendition)
+            if self.is_packaged(rendition):
+                os.makedirs(os.path.dirname(output_files[rendition]), exist_ok=True)
+            if rendition == 'hls':
+                for variant in self.variants:
+                    output_files['hls_' + variant['name']] = self.get_hls_variant_file(file_name, variant)
+                    os.makedirs(os.path.dirname(output_files['hls_' + variant['name']]), exist_ok=True)
+        # thumbnails are taken on the same decode pass as the mp4 rendition, always on local disk
+        if self.thumbnails_enabled and 'mp4' in renditions:
+            shutil.rmtree(self.get_thumbnails_folder(file_name), ignore_errors=True)
+            os.makedirs(self.get_thumbnails_folder(file_name))
+            output_files['thumbnails'] = os.path.join(self.get_thumbnails_folder(file_name), 'thumb_%05d.jpg')
+
+        # devices record MJPEG, newer ones H.264 that is remuxed instead of encoded again
+        media_info = self.media_infos.get(file_name)
+        codec = media_info.codec if media_info is not None else 'image/jpeg'
+        remux = settings.TRANSCODING_REMUX_ENABLED and codec in MKV2MultiTranscoder.REMUXABLE_CODECS
+        if remux:
+            self.logger.info("ExamPendingRequestProcessor - {tmp_name} is {codec}, remuxing source resolution h264".format(
+                tmp_name=file_name,
+                codec=codec))
+
+        self.logger.info(
+            "ExamPendingRequestProcessor - start transcoding of file {tmp_name} to {outputs}".format(
+                tmp_name=file_name,
+                outputs=", ".join(list(output_files.values()) + [uploader.name for uploader in uploaders.values()])))
+        for uploader in uploaders.values():
+            uploader.start()
+        output_streams = dict((rendition, uploader.stream) for rendition, uploader in uploaders.items())
+        duration = media_info.duration if media_info is not None else pending_exam.duration
+        segments = self.get_segments_count(duration, remux)
+        failed = True
+        try:
+            if segments > 1:
+                transcoders = self.transcode_segments(file_name, output_files, output_streams, codec, segments,
+                                                      duration)
+            else:
+                transcoder = self.get_transcoder(file_name, output_files, output_streams, codec, remux)
+                self.set_watchdog(transcoder, duration)
+                transcoder.apply()
+                transcoders = [(",".join(renditions), transcoder)]
+            failed = False
+        finally:
+            if failed:
+                # building or running the pipelines raised, nothing would end the streams and the
+                # uploaders would wait on them forever
+                for stream in output_streams.values():
+                    stream.close(error="transcoding failed")
+            for uploader in uploaders.values():
+                uploader.join()
+
+        errors = [transcoder.error for _label, transcoder in transcoders if transcoder.error is not None]
+        errors.extend(uploader.error for uploader in uploaders.values() if uploader.error is not None)
+        for label, transcoder in transcoders:
+            if transcoder.stats:
+                self.save_metric(pending_exam, file_name, label, transcoder, succeeded=transcoder.error is None)
+        if errors:
+            raise Exception("ExamPendingRequestProcessor - transcoding of {tmp_name} failed: {errors}".format(
+                tmp_name=file_name,
+                errors="; ".join(errors)))
+        if 'hls' in renditions and self.has_hls_variants():
+            write_hls_master_playlist(self.get_hls_master_file(file_name),
+                                      [(output_files['hls'], None, None)] +
+                                      [(output_files['hls_' + variant['name']], variant['width'], variant['height'])
+                                       for variant in self.variants])
+        if 'thumbnails' in output_files:
+            self.build_thumbnails(file_name)
+        self.logger.info("ExamPendingRequestProcessor - finishing {renditions} trascoding".format(
+            renditions="/".join(renditions)))
+
+    def get_transcoder(self, file_name, output_files, output_streams, codec, remux):
+        # single pass, source is demuxed and decoded once for all renditions
+        return MKV2MultiTranscoder(file_name, output_files, output_streams=output_streams,
+                                   variants=self.variants, thumbnails=self.get_thumbnails_options(),
+                                   preset=self.preset, codec=codec, remux=remux)
+
+    def transcode_segments(self, file_name, output_files, output_streams, codec, segments, duration):
+        """
+        the webm and h264 ( source resolution and ladder ) encodings are split on time ranges encoded in
+        parallel, gstreamer streaming threads do not hold the GIL so threads are enough to use all the cores
+        segments are then joined ( and packaged to hls/dash ) without encoding again. ogg and thumbnails are
+        cheap, they are done on a single pipeline along with the segments
+        returns a list of ( label, transcoder )
+        """
+        segments_folder = self.get_segments_folder(file_name)
+        shutil.rmtree(segments_folder, ignore_errors=True)
+        outputs = list(output_files) + list(output_streams)
+        # ( segments folder, rendition, joined rendition output -> key on output_files/output_streams )
+        joins = []
+        if 'webm' in outputs:
+            joins.append(('webm', 'webm', {'webm': 'webm'}))
+        for suffix in [''] + ['_' + variant['name'] for variant in self.variants]:
+            keys = dict((rendition, rendition + suffix) for rendition in ('mp4', 'hls', 'dash')
+                        if rendition + suffix in outputs)
+            if keys:
+                joins.append(('mp4' + suffix, 'mp4', keys))
+        for segment_key, _rendition, _keys in joins:
+            os.makedirs(os.path.join(segments_folder, segment_key))
+
+        def get_segment_file(segment_key, index):
+            return os.path.join(segments_folder, segment_key, 'segment_{index:05d}.{ext}'.format(
+                index=index, ext=segment_key.split('_')[0]))
+
+        transcoders = []
+        segment_duration = duration / segments
+        for index in range(segments if joins else 0):
+            transcoder = MKV2MultiTranscoder(file_name, dict((segment_key, get_segment_file(segment_key, index))
+                                                             for segment_key, _rendition, _keys in joins),
+                                             variants=self.variants, preset=self.preset, codec=codec, remux=False,
+                                             segmentable=True)
+            # last one is open ended, the request duration is rounded
+            transcoder.set_range(index * segment_duration,
+                                 None if index == segments - 1 else (index + 1) * segment_duration)
+            self.set_watchdog(transcoder, duration)
+            transcoders.append(("segment {index}/{segments} {outputs}".format(
+                index=index + 1, segments=segments, outputs=",".join(key for key, _rendition, _keys in joins)),
+                transcoder))
+        single_outputs = [output for output in ('ogg', 'thumbnails') if output in outputs]
+        if single_outputs:
+            transcoders.append((",".join(single_outputs), self.set_watchdog(MKV2MultiTranscoder(
+                file_name,
+                dict((output, output_files[output]) for output in single_outputs if output in output_files),
+                output_streams=dict((output, output_streams[output]) for output in single_outputs
+                                    if output in output_streams),
+                thumbnails=self.get_thumbnails_options(), preset=self.preset, codec=codec, remux=False), duration)))
+
+        self.logger.info("ExamPendingRequestProcessor - encoding {tmp_name} on {segments} segments".format(
+            tmp_name=file_name,
+            segments=segments))
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            list(executor.map(lambda item: item[1].apply(), transcoders))
+        if any(transcoder.error is not None for _label, transcoder in transcoders):
+            # joined renditions will never be written, closing their streams ends the uploaders
+            for stream in output_streams.values():
+                stream.close(error="segments encoding failed")
+            return transcoders
+
+        join_transcoders = []
+        for segment_key, rendition, keys in joins:
+            join_transcoders.append(("join {outputs}".format(outputs=",".join(keys.values())), self.set_watchdog(SegmentsJoinTranscoder(
+                os.path.join(segments_folder, segment_key, 'segment_*.' + rendition), rendition,
+                output_files=dict((key, output_files[output]) for key, output in keys.items() if output in output_files),
+                output_streams=dict((key, output_streams[output]) for key, output in keys.items()
+                                    if output in output_streams)), duration)))
+        with ThreadPoolExecutor(max_workers=max(1, len(join_transcoders))) as executor:
+            list(executor.map(lambda item: item[1].apply(), join_transcoders))
+        shutil.rmtree(segments_folder, ignore_errors=True)
+        return transcoders + join_transcoders
+
+    def save_metric(self, pending_exam, file_name, renditions, transcoder, succeeded):
+        metric = TranscodingMetric()
+        metric.pending_request = pending_exam
+        metric.worker = pending_exam.claimed_by or ''
+        metric.attempt = pending_exam.attempts
+        metric.file_name = Path(file_name).name
+        metric.renditions = renditions
+        metric.preset = self.preset
+        if pending_exam.claimed_at is not None:
+            metric.queue_wait = (pending_exam.claimed_at - pending_exam.created).total_seconds()
+        metric.set_stats(transcoder.stats, duration=pending_exam.duration)
+        metric.succeeded = succeeded
+        metric.save()
+        self.logger.info("ExamPendingRequestProcessor - request {id} {renditions} took {wall_time:.1f}s "
+                         "( {speed}x real time, encode {fps} fps )".format(
+                            id=pending_exam.id,
+                            renditions=metric.renditions,
+                            wall_time=metric.wall_time,
+                            speed=metric.speed,
+                            fps=metric.encode_fps))
+
+    def build_thumbnails(self, file_name):
+        """
+        turns the extracted frames into the poster and the preview sprite sheet
+        """
+        thumbnails_folder = self.get_thumbnails_folder(file_name)
+        thumbnail_files = get_thumbnail_files(thumbnails_folder)
+        build_poster(thumbnail_files, os.path.join(thumbnails_folder, self.POSTER_FILE))
+        build_sprite_sheet(thumbnail_files, os.path.join(thumbnails_folder, self.SPRITE_FILE),
+                           settings.EXAM_VIDEO_SPRITE_COLUMNS,
+                           settings.EXAM_VIDEO_SPRITE_TILE_SIZE[0],
+                           settings.EXAM_VIDEO_SPRITE_TILE_SIZE[1])
+        self.logger.info("ExamPendingRequestProcessor - {count} thumbnails for {tmp_name}".format(
+            count=len(thumbnail_files),
+            tmp_name=file_name))
+
+    def store_thumbnails(self, exam, file_names):
+        # an exam has a single poster/sprite, taken from its first video
+        for file_name in file_names:
+            thumbnails_folder = self.get_thumbnails_folder(file_name)
+            poster_file = os.path.join(thumbnails_folder, self.POSTER_FILE)
+            sprite_file = os.path.join(thumbnails_folder, self.SPRITE_FILE)
+            if not os.path.exists(poster_file) or not os.path.exists(sprite_file):
+                continue
+            base_name = Path(os.path.splitext(file_name)[0]).name
+            with open(poster_file, "rb") as file:
+                exam.poster.save(base_name + '_' + self.POSTER_FILE, File(file), save=False)
+            with open(sprite_file, "rb") as file:
+                exam.sprite.save(base_name + '_' + self.SPRITE_FILE, File(file), save=False)
+            exam.set_sprite(settings.EXAM_VIDEO_THUMBNAILS_INTERVAL,
+                            settings.EXAM_VIDEO_SPRITE_COLUMNS,
+                            settings.EXAM_VIDEO_SPRITE_TILE_SIZE[0],
+                            settings.EXAM_VIDEO_SPRITE_TILE_SIZE[1])
+            exam.save()
+            return
+
+    def check_done_renditions(self, pending_exam, file_names):
+        """
+        moves the request back to the last step whose outputs are still on disk
+        """
+        if pending_exam.status >= ExamPendingRequest.STORED:
+            return
+        last_status = ExamPendingRequest.QUEUED
+        for status in sorted(set(rendition.status for rendition in self.renditions)):
+            if status > pending_exam.status:
+                break
+            for rendition in [rendition.name for rendition in self.renditions if rendition.status == status]:
+                for file_name in file_names:
+                    if not self.rendition_exists(file_name, rendition):
+                        self.set_status(pending_exam, last_status)
+                        return
+            last_status = status
+
+    def skip_progressive_renditions(self, pending_exam, pending_videos, file_names):
+        """
+        moves the request forward past the renditions already encoded while it was being uploaded
+        ( see ProgressiveUploadProcessor )
+        """
+        if not all(pending_video.file_upload is not None and pending_video.file_upload.is_progressive_done()
+                   for pending_video in pending_videos):
+            return
+        done_status = pending_exam.status
+        for status in sorted(set(rendition.status for rendition in self.renditions)):
+            if status <= pending_exam.status:
+                continue
+            if not all(self.rendition_exists(file_name, rendition.name) for file_name in file_names
+                       for rendition in self.renditions if rendition.status == status):
+                break
+            done_status = status
+        if done_status > pending_exam.status:
+            self.logger.info("ExamPendingRequestProcessor - request {id} was encoded while uploading".format(
+                id=pending_exam.id))
+            self.set_status(pending_exam, done_status)
+
+    def encode(self, pending_exam, file_names):
+        remaining = [rendition for rendition in self.renditions if rendition.status > pending_exam.status]
+        if not remaining:
+            return
+
+        if settings.TRANSCODING_SINGLE_PASS:
+            # all the remaining renditions at once, source is decoded only once
+            for file_name in file_names:
+                self.transcode(pending_exam, file_name, [rendition.name for rendition in remaining])
+            self.set_status(pending_exam, max(rendition.status for rendition in remaining))
+            return
+
+        # one pass per step, slower but with a checkpoint after each one
+        for status in sorted(set(rendition.status for rendition in remaining)):
+            for file_name in file_names:
+                self.transcode(pending_exam, file_name, [rendition.name for rendition in remaining if rendition.status == status])
+            self.set_status(pending_exam, status)
+
+    def store_packaged(self, file_name, rendition):
+        """
+        uploads the segments and the playlists/manifest keeping their names, so the relative
+        urls on the playlists resolve, returns the master playlist or manifest storage name
+        """
+        output_folder = os.path.dirname(self.get_output_file(file_name, rendition))
+        storage_folder = os.path.dirname(self.get_storage_name(file_name, rendition))
+        for folder, _folders, names in os.walk(output_folder):
+            for name in sorted(names):
+                relative_name = os.path.relpath(os.path.join(folder, name), output_folder).replace(os.sep, '/')
+                with open(os.path.join(folder, name), "rb") as file:
+                    self.storage.save(storage_folder + '/' + relative_name, File(file))
+        if rendition == 'hls' and self.has_hls_variants():
+            return storage_folder + '/' + self.HLS_MASTER_PLAYLIST
+        return self.get_storage_name(file_name, rendition)
+
+    def store(self, pending_exam, file_names):
+        with transaction.atomic():
+            # create exam
+            exam = Exam()
+            exam.video_views = 0
+            exam.taker = pending_exam.taker
+            exam.exercise = pending_exam.exercise
+            exam.device = pending_exam.device
+            exam.duration = pending_exam.duration
+            # if the exam is from an tutorial then auto approve it
+            if exam.exercise.is_tutorial():
+                exam.approve(notes=_('AutoAproved bc tutorial'))
+                exam.evaluator = exam.taker
+            exam.save()
+
+            self.logger.info("ExamPendingRequestProcessor - new exam created")
+
+            for file_name in file_names:
+                source_video = None
+                for rendition, mime_type, _status, _packaged_name, variant in self.renditions:
+                    video = ExamVideo()
+                    video.exam = exam
+                    video.type = mime_type
+                    video.views = 0
+                    video.author = pending_exam.taker
+                    video.content_hash = self.content_hashes.get(file_name, '')
+                    if variant is not None:
+                        video.set_variant(variant['name'], variant['width'], variant['height'], variant['bitrate'])
+                    if self.is_streamed(rendition):
+                        # already uploaded while encoding
+                        video.file.name = self.get_storage_name(file_name, rendition)
+                        video.save()
+                    elif self.is_packaged(rendition):
+                        video.file.name = self.store_packaged(file_name, rendition)
+                        video.save()
+                    else:
+                        output_file = self.get_output_file(file_name, rendition)
+                        with open(output_file, "rb") as file:
+                            django_file = File(file)
+                            video.file.save(Path(output_file).name, django_file, save=True)
+                            video.save()
+                    if rendition == 'mp4':
+                        source_video = video
+                    self.logger.info("ExamPendingRequestProcessor - saved video {type}".format(type=mime_type))
+
+                # placeholders, generated the first time they are requested
+                for lazy_rendition in self.get_lazy_renditions():
+                    video = ExamVideo()
+                    video.exam = exam
+                    video.type = lazy_rendition.type
+                    video.views = 0
+                    video.author = pending_exam.taker
+                    video.content_hash = self.content_hashes.get(file_name, '')
+                    video.is_lazy = True
+                    video.status = ExamVideo.LAZY
+                    video.source = source_video
+                    video.save()
+
+            if self.thumbnails_enabled:
+                self.store_thumbnails(exam, file_names)
+
+            pending_exam.exam = exam
+            pending_exam.mark_as_processed()
+            pending_exam.save(update_fields=['exam', 'is_processed', 'status', 'modified'])
+
+        return exam
+
+    def find_duplicate(self, pending_exam, pending_videos):
+        """
+        exam already stored from the same recordings for the same taker and exercise ( ex: an upload
+        retried by the device ), its renditions are reused instead of encoding them again
+        """
+        content_hashes = [pending_video.content_hash for pending_video in pending_videos]
+        if not content_hashes or not all(content_hashes):
+            return None
+        exams = Exam.objects.filter(taker=pending_exam.taker, exercise=pending_exam.exercise)
+        for content_hash in set(content_hashes):
+            exams = exams.filter(videos__content_hash=content_hash)
+        return exams.distinct().order_by('id').first()
+
+    def cleanup(self, pending_videos, file_names):
+        # removing tmp files, only once the exam is committed
+        self.logger.info("ExamPendingRequestProcessor - removing temp files...")
+        for file_name in file_names:
+            for rendition in [rendition.name for rendition in self.renditions]:
+                output_file = self.get_output_file(file_name, rendition)
+                if self.is_packaged(rendition):
+                    shutil.rmtree(os.path.dirname(output_file), ignore_errors=True)
+                elif os.path.exists(output_file):
+                    os.remove(output_file)
+            shutil.rmtree(self.get_thumbnails_folder(file_name), ignore_errors=True)
+            shutil.rmtree(self.get_segments_folder(file_name), ignore_errors=True)
+        for pending_video in pending_videos:
+            if pending_video.file_upload is not None:
+                pending_video.file_upload.delete()
+            pending_video.delete()
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+    def get_source_file(self, pending_video):
+        """
+        local path of the uploaded video, on TRANSCODING_WORK_DIR if the upload is on an object storage
+        ( see download_source )
+        """
+        file_upload = pending_video.file_upload
+        storage = file_upload.file.storage
+        if isinstance(storage, FileSystemStorage):
+            return storage.path(file_upload.file.name)
+        return os.path.join(settings.TRANSCODING_WORK_DIR, Path(file_upload.file.name).name)
+
+    def download_source(self, pending_video, source_file):
+        """
+        downloads an upload kept on an object storage to source_file, its content hash is computed on
+        the way if the upload could not do it
+        """
+        file_upload = pending_video.file_upload
+        storage = file_upload.file.storage
+        if isinstance(storage, FileSystemStorage):
+            return
+        if os.path.exists(source_file) and os.path.getsize(source_file) == file_upload.offset:
+            # already downloaded by a previous attempt
+            return
+        os.makedirs(settings.TRANSCODING_WORK_DIR, exist_ok=True)
+        self.logger.info("ExamPendingRequestProcessor - downloading {name} to {source_file}".format(
+            name=file_upload.file.name,
+            source_file=source_file))
+        content_hash = hashlib.new(FileUpload.CONTENT_HASH_ALGORITHM)
+        with storage.open(file_upload.file.name, 'rb') as source, open(source_file + '.download', 'wb') as destination:
+            for data in source.chunks():
+                destination.write(data)
+                content_hash.update(data)
+        os.replace(source_file + '.download', source_file)
+        if not pending_video.content_hash:
+            pending_video.content_hash = content_hash.hexdigest()
+            pending_video.save(update_fields=['content_hash', 'modified'])
+
+    def process(self, pending_exam):
+        pending_videos = list(pending_exam.videos.order_by('id'))
+        file_names = [self.get_source_file(pending_video) for pending_video in pending_videos]
+
+        self.logger.info(
+            "ExamPendingRequestProcessor - processing request {id} files {file_names} duration {seconds} seconds, status {status} attempt {attempts}".format(
+                id=pending_exam.id,
+                file_names=", ".join(file_names),
+                seconds=pending_exam.duration,
+                status=pending_exam.get_status_display(),
+                attempts=pending_exam.attempts))
+
+        # hashes kept by the upload are looked up before downloading anything
+        exam = self.find_duplicate(pending_exam, pending_videos)
+        if exam is None:
+            missing_hashes = not all(pending_video.content_hash for pending_video in pending_videos)
+            for pending_video, file_name in zip(pending_videos, file_names):
+                self.download_source(pending_video, file_name)
+            if missing_hashes:
+                # computed while downloading
+                exam = self.find_duplicate(pending_exam, pending_videos)
+        self.content_hashes = dict(zip(file_names, [pending_video.content_hash for pending_video in pending_videos]))
+        if exam is not None:
+            self.logger.info("ExamPendingRequestProcessor - request {id} is a duplicate of exam {exam_id}".format(
+                id=pending_exam.id,
+                exam_id=exam.id))
+            pending_exam.exam = exam
+            pending_exam.mark_as_processed()
+            pending_exam.save(update_fields=['exam', 'is_processed', 'status', 'modified'])
+            self.cleanup(pending_videos, file_names)
+            return exam
+
+        self.media_infos = self.probe_videos(pending_videos, file_names)
+        self.verify_duration(pending_exam)
+        self.variants = self.get_variants()
+        self.renditions = self.get_renditions()
+
+        self.preset = self.get_encoder_preset(pending_exam)
+        self.logger.info("ExamPendingRequestProcessor - request {id} encoder preset {preset}".format(
+            id=pending_exam.id,
+            preset=self.preset))
+
+        self.check_done_renditions(pending_exam, file_names)
+        self.skip_progressive_renditions(pending_exam, pending_videos, file_names)
+        self.encode(pending_exam, file_names)
+        exam = self.store(pending_exam, file_names)
+        self.cleanup(pending_videos, file_names)
+        return exam
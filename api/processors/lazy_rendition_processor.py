@@ -0,0 +1,122 @@
+from ..models import ExamVideo, Video
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Sum
+import os
+import shutil
+import logging
+import tempfile
+from ..video_utils import MP42MultiTranscoder, MediaProbe
+from .exam_pending_request_processor import ExamPendingRequestProcessor
+from pathlib import Path
+
+
+class LazyRenditionProcessor:
+    """
+    generates the lazy renditions ( see ExamPendingRequestProcessor.get_lazy_renditions ) requested
+    on playback from their mp4 source rendition, and evicts the ones that are not played anymore
+    generated renditions behave as a cache: least recently played ones are evicted first
+    """
+
+    RENDITIONS = {
+        Video.OGG: 'ogg',
+        Video.WEBM: 'webm',
+    }
+
+    # work folders on the temp dir, the ones left by crashed jobs are removed by UploadReaper
+    WORK_FOLDER_PREFIX = 'lazy_rendition_'
+
+    def __init__(self):
+        self.logger = logging.getLogger('cronjobs')
+        self.storage = ExamVideo._meta.get_field('file').storage
+        self.probe = MediaProbe(timeout=settings.MEDIA_PROBE_TIMEOUT)
+
+    def generate(self, video):
+        source = video.source
+        if source is None or not source.file:
+            raise Exception("LazyRenditionProcessor - video {id} has no source".format(id=video.id))
+        rendition = self.RENDITIONS[video.type]
+        work_folder = tempfile.mkdtemp(prefix=LazyRenditionProcessor.WORK_FOLDER_PREFIX)
+        try:
+            source_file = os.path.join(work_folder, Path(source.file.name).name)
+            with source.file.open('rb') as remote_file, open(source_file, 'wb') as local_file:
+                shutil.copyfileobj(remote_file, local_file, settings.TRANSCODING_STREAM_UPLOAD_CHUNK_SIZE)
+            output_file = os.path.splitext(source_file)[0] + '.' + rendition
+
+            self.logger.info("LazyRenditionProcessor - generating {rendition} of video {id} from {source}".format(
+                rendition=rendition,
+                id=video.id,
+                source=source.file.name))
+            transcoder = MP42MultiTranscoder(source_file, {rendition: output_file},
+                                             preset=settings.TRANSCODING_ENCODER_PRESET)
+            ExamPendingRequestProcessor.set_watchdog(transcoder, self.probe.discover(source_file).duration)
+            transcoder.apply()
+            if transcoder.error is not None:
+                raise Exception("LazyRenditionProcessor - error generating video {id}: {error}".format(
+                    id=video.id,
+                    error=transcoder.error))
+
+            with open(output_file, "rb") as file:
+                video.file.save(Path(output_file).name, File(file), save=False)
+            video.mark_as_generated(os.path.getsize(output_file))
+            video.save()
+        finally:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    def process(self, video):
+        """
+        generates a claimed rendition
+        """
+        try:
+            self.generate(video)
+        except Exception as exc:
+            # back to lazy, it is queued again on the next request
+            self.logger.error("LazyRenditionProcessor - error generating video {id}: {error}".format(
+                id=video.id,
+                error=exc))
+            video.status = ExamVideo.LAZY
+            video.save(update_fields=['status', 'modified'])
+
+    def process_next(self, claim_timeout):
+        """
+        claims and generates the next requested rendition, returns False if there was nothing to claim
+        """
+        video = ExamVideo.objects.claim_next_lazy(claim_timeout)
+        if video is None:
+            return False
+        self.process(video)
+        return True
+
+    def evict_video(self, video):
+        if video.file:
+            self.storage.delete(video.file.name)
+        video.mark_as_evicted()
+        video.save(update_fields=['status', 'file', 'size', 'modified'])
+
+    def evict(self, max_idle, max_size=0):
+        """
+        evicts the renditions not played during max_idle seconds and, while the generated renditions
+        take more than max_size bytes ( 0 is unbounded ), the least recently played ones
+        returns the evicted videos count and bytes
+        """
+        evicted = 0
+        evicted_bytes = 0
+        for video in ExamVideo.objects.evictable(max_idle):
+            evicted_bytes += video.size or 0
+            evicted += 1
+            self.evict_video(video)
+
+        if max_size > 0:
+            size = ExamVideo.objects.cached_lazy().aggregate(size=Sum('size'))['size'] or 0
+            for video in ExamVideo.objects.cached_lazy().iterator():
+                if size <= max_size:
+                    break
+                size -= video.size or 0
+                evicted_bytes += video.size or 0
+                evicted += 1
+                self.evict_video(video)
+
+        self.logger.info("LazyRenditionProcessor - evicted {count} renditions, {size} bytes".format(
+            count=evicted,
+            size=evicted_bytes))
+        return evicted, evicted_bytes
@@ -0,0 +1,59 @@
+from ..models import FileUpload
+from .exam_pending_request_processor import ExamPendingRequestProcessor
+from ..video_utils import ProgressiveMKV2MultiTranscoder
+from django.conf import settings
+
+
+class ProgressiveUploadProcessor(ExamPendingRequestProcessor):
+    """
+    transcodes matroska uploads while their chunks are still arriving, so most of the encoding overlaps
+    the transfer. renditions are written where ExamPendingRequestProcessor looks for them ( next to the
+    upload, named after it ), once the upload is completed and its request is processed only what is
+    missing is encoded ( see ExamPendingRequestProcessor.skip_progressive_renditions )
+    """
+
+    def get_transcoder(self, file_name, output_files, output_streams, codec, remux):
+        return ProgressiveMKV2MultiTranscoder(file_name, output_files, output_streams=output_streams,
+                                              variants=self.variants, thumbnails=self.get_thumbnails_options(),
+                                              preset=self.preset, codec=codec, remux=remux)
+
+    @staticmethod
+    def set_watchdog(transcoder, duration):
+        # the upload can pause for a while, and its duration is not known until it is completed
+        transcoder.set_watchdog(settings.TRANSCODING_PROGRESSIVE_STALL_TIMEOUT)
+        return transcoder
+
+    def save_metric(self, pending_exam, file_name, renditions, transcoder, succeeded):
+        # there is no request yet
+        self.logger.info("ProgressiveUploadProcessor - {file_name} {renditions} stats {stats}".format(
+            file_name=file_name,
+            renditions=renditions,
+            stats=transcoder.stats))
+
+    def process(self, file_upload):
+        """
+        transcodes a claimed upload, marks it as done only if the upload was completed and fully read
+        """
+        file_name = file_upload.file.path
+        self.logger.info("ProgressiveUploadProcessor - transcoding upload {id} {file_name} while it arrives".format(
+            id=file_upload.id,
+            file_name=file_name))
+        try:
+            # only the headers are there, the duration is not known yet ( 0 also keeps it on a single pipeline )
+            self.media_infos = {file_name: self.probe.discover(file_name)._replace(duration=0)}
+            self.variants = self.get_variants()
+            self.renditions = self.get_renditions()
+            self.preset = settings.TRANSCODING_ENCODER_PRESET
+            self.transcode(None, file_name, [rendition.name for rendition in self.renditions])
+            file_upload.refresh_from_db()
+            if file_upload.status != FileUpload.COMPLETE:
+                raise Exception("ProgressiveUploadProcessor - upload {id} was not completed".format(id=file_upload.id))
+            file_upload.mark_progressive_as_done()
+        except Exception as exc:
+            # outputs are encoded again once the request is processed
+            self.logger.error("ProgressiveUploadProcessor - error transcoding upload {id}: {error}".format(
+                id=file_upload.id,
+                error=exc))
+            file_upload.mark_progressive_as_failed()
+        file_upload.save(update_fields=['progressive_status'])
+        return file_upload.is_progressive_done()
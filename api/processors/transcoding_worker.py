@@ -0,0 +1,189 @@
+from ..models import ExamPendingRequest, ExamVideo, FileUpload
+from .exam_pending_request_processor import ExamPendingRequestProcessor
+from .lazy_rendition_processor import LazyRenditionProcessor
+from .progressive_upload_processor import ProgressiveUploadProcessor
+from ..utils.disk_space import DiskSpaceMonitor
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+
+
+class TranscodingWorker:
+    """
+    claims pending requests from the db and processes them one at a time
+    while a request is being processed a heartbeat thread keeps its claim
+    alive, if the worker dies the claim expires and other worker picks it up
+    with progressive transcoding on, uploads still arriving are transcoded once there are no pending requests left
+    requested lazy renditions are generated once there is nothing else to do
+    """
+
+    def __init__(self, name=None):
+        self.name = name or "{host}:{pid}".format(host=socket.gethostname(), pid=os.getpid())
+        self.claim_timeout = settings.TRANSCODING_CLAIM_TIMEOUT
+        self.heartbeat_interval = settings.TRANSCODING_HEARTBEAT_INTERVAL
+        self.max_attempts = settings.TRANSCODING_MAX_ATTEMPTS
+        self.processor = ExamPendingRequestProcessor()
+        self.lazy_processor = LazyRenditionProcessor()
+        self.progressive_processor = ProgressiveUploadProcessor()
+        self.disk_space = DiskSpaceMonitor(settings.DISK_SPACE_PATH,
+                                           settings.DISK_SPACE_MIN_FREE,
+                                           settings.TRANSCODING_DISK_FOOTPRINT_FACTOR,
+                                           self.claim_timeout)
+        # progressive transcoding tails the upload file, so only when chunks are appended to a local one
+        self.progressive_enabled = settings.TRANSCODING_PROGRESSIVE_ENABLED and not FileUpload.stores_parts()
+        self.logger = logging.getLogger('cronjobs')
+
+    def _heartbeat(self, pending_exam_id, stop_event):
+        try:
+            while not stop_event.wait(self.heartbeat_interval):
+                ExamPendingRequest.objects.filter(pk=pending_exam_id, claimed_by=self.name)\
+                    .update(claimed_at=timezone.now())
+        finally:
+            # db connections are per thread
+            connections.close_all()
+
+    def _lazy_heartbeat(self, video_id, stop_event):
+        try:
+            while not stop_event.wait(self.heartbeat_interval):
+                ExamVideo.objects.filter(pk=video_id, status=ExamVideo.GENERATING).update(modified=timezone.now())
+        finally:
+            connections.close_all()
+
+    def _progressive_heartbeat(self, file_upload_id, stop_event):
+        try:
+            while not stop_event.wait(self.heartbeat_interval):
+                FileUpload.objects.filter(pk=file_upload_id, progressive_claimed_by=self.name)\
+                    .update(progressive_claimed_at=timezone.now())
+        finally:
+            connections.close_all()
+
+    def run_progressive_once(self):
+        """
+        transcodes the next upload still in progress, returns False if there was nothing to claim
+        """
+        file_upload = FileUpload.objects.claim_next_progressive(self.name, self.claim_timeout,
+                                                                settings.TRANSCODING_PROGRESSIVE_MIN_BYTES)
+        if file_upload is None:
+            return False
+
+        self.logger.info("TranscodingWorker {name} - claimed upload {id}".format(name=self.name, id=file_upload.id))
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(target=self._progressive_heartbeat, args=(file_upload.id, stop_event), daemon=True)
+        heartbeat.start()
+        try:
+            self.progressive_processor.process(file_upload)
+        finally:
+            stop_event.set()
+            heartbeat.join()
+        return True
+
+    def run_lazy_once(self):
+        """
+        generates the next requested lazy rendition, returns False if there was nothing requested
+        """
+        video = ExamVideo.objects.claim_next_lazy(self.claim_timeout)
+        if video is None:
+            return False
+
+        self.logger.info("TranscodingWorker {name} - claimed lazy video {id}".format(name=self.name, id=video.id))
+        # the claim is refreshed through the video modified date while it is being generated
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(target=self._lazy_heartbeat, args=(video.id, stop_event), daemon=True)
+        heartbeat.start()
+        try:
+            self.lazy_processor.process(video)
+        finally:
+            stop_event.set()
+            heartbeat.join()
+        return True
+
+    def can_process(self, pending_exam):
+        if self.progressive_enabled and FileUpload.objects.progressive_encoding(self.claim_timeout)\
+                .filter(videos__request=pending_exam).exists():
+            # other worker is still reading the end of the upload, its renditions are reused once it is done
+            self.logger.info("TranscodingWorker {name} - request {id} is being encoded while uploading, postponed".format(
+                name=self.name,
+                id=pending_exam.id))
+            return False
+
+        if not self.disk_space.can_transcode(pending_exam):
+            self.logger.warning("TranscodingWorker {name} - not enough disk space for request {id}, postponed".format(
+                name=self.name,
+                id=pending_exam.id))
+            return False
+        return True
+
+    def claim_next_processable(self):
+        """
+        claims the next scheduled request that can be processed now, the ones that can not are given back
+        and skipped, so they do not hold the head of the queue ( ex: a smaller one could fit on disk )
+        """
+        postponed = []
+        while True:
+            pending_exam = ExamPendingRequest.objects.claim_next(self.name, self.claim_timeout, exclude=postponed)
+            if pending_exam is None or self.can_process(pending_exam):
+                return pending_exam
+            pending_exam.postpone()
+            pending_exam.save(update_fields=['claimed_by', 'claimed_at', 'attempts', 'modified'])
+            postponed.append(pending_exam.id)
+
+    def run_once(self):
+        """
+        claims and processes the next pending request, returns False if there was nothing that could be
+        processed now ( postponed ones are left on the queue )
+        """
+        if not self.disk_space.can_transcode():
+            self.logger.warning("TranscodingWorker {name} - disk space below the minimum, not claiming".format(
+                name=self.name))
+            return False
+
+        pending_exam = self.claim_next_processable()
+        if pending_exam is None:
+            if self.progressive_enabled and self.run_progressive_once():
+                return True
+            if settings.EXAM_VIDEO_LAZY_RENDITIONS:
+                return self.run_lazy_once()
+            return False
+
+        self.logger.info("TranscodingWorker {name} - claimed request {id}".format(name=self.name, id=pending_exam.id))
+        stop_event = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(pending_exam.id, stop_event), daemon=True)
+        heartbeat.start()
+        try:
+            self.processor.process(pending_exam)
+        except Exception as exc:
+            # the claim is kept, so the request is retried ( from its last finished step ) once it expires
+            self.logger.error("TranscodingWorker {name} - error processing request {id}: {error}".format(
+                name=self.name,
+                id=pending_exam.id,
+                error=exc))
+            pending_exam.mark_as_failed(traceback.format_exc(), self.max_attempts)
+            pending_exam.save(update_fields=['last_error', 'status', 'modified'])
+        finally:
+            stop_event.set()
+            heartbeat.join()
+        return True
+
+    def run_until_empty(self):
+        while self.run_once():
+            pass
+
+    def run_forever(self, poll_interval):
+        self.logger.info("TranscodingWorker {name} - started".format(name=self.name))
+        while True:
+            if not self.run_once():
+                time.sleep(poll_interval if self.disk_space.can_transcode() else settings.DISK_SPACE_RETRY_AFTER)
+
+
+def run_transcoding_worker_until_empty(index):
+    """
+    entry point for the cron job worker pool processes ( it must be a module level function to be picklable )
+    """
+    TranscodingWorker().run_until_empty()
+    connections.close_all()
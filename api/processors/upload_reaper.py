@@ -0,0 +1,203 @@
+from ..models import FileUpload, ExamPendingRequestVideo
+from .lazy_rendition_processor import LazyRenditionProcessor
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+from drf_chunked_upload.settings import UPLOAD_PATH
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+
+class UploadReaper:
+    """
+    removes what crashed or abandoned uploads and jobs leave behind: incomplete uploads older than a ttl,
+    raw videos whose request is gone, temp outputs ( renditions, chunks, thumbnails, segments, downloads )
+    of uploads that do not exist anymore and work folders of crashed lazy rendition jobs. deletes in batches, so no long transaction / scan holds the db
+    """
+
+    def __init__(self, ttl, batch_size, claim_timeout, dry_run=False):
+        self.ttl = ttl
+        self.claim_timeout = claim_timeout
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.logger = logging.getLogger('cronjobs')
+        self.storage = FileUpload._meta.get_field('file').storage
+        self.raw_videos_storage = ExamPendingRequestVideo._meta.get_field('file').storage
+
+    @staticmethod
+    def get_size(path):
+        if not os.path.isdir(path):
+            return os.path.getsize(path)
+        size = 0
+        for folder, _, names in os.walk(path):
+            for name in names:
+                try:
+                    size += os.path.getsize(os.path.join(folder, name))
+                except OSError:
+                    pass
+        return size
+
+    @staticmethod
+    def get_upload_id(name):
+        """
+        every file derived from an upload is named after its id ( <id>.part, <id>_720p.mp4, <id>_chunks ... )
+        """
+        try:
+            return uuid.UUID(name[:36])
+        except ValueError:
+            return None
+
+    def remove_path(self, path):
+        size = self.get_size(path)
+        if not self.dry_run:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        return size
+
+    def reap_stale_uploads(self):
+        count = 0
+        reclaimed = 0
+        while True:
+            # deleted rows leave the query, on a dry run the next batch is paged instead
+            batch = list(FileUpload.objects.stale(self.ttl, self.claim_timeout)
+                         [count if self.dry_run else 0:][:self.batch_size])
+            if not batch:
+                break
+            for file_upload in batch:
+                reclaimed += file_upload.offset
+                if not self.dry_run:
+                    file_upload.delete()
+            count += len(batch)
+            self.logger.info("UploadReaper - {count} stale uploads so far, {size} bytes".format(
+                count=count,
+                size=reclaimed))
+        return count, reclaimed
+
+    def reap_orphaned_raw_videos(self):
+        count = 0
+        reclaimed = 0
+        created_before = timezone.now() - timedelta(seconds=self.ttl)
+        orphans = ExamPendingRequestVideo.objects.filter(request__isnull=True, created__lt=created_before).order_by('id')
+        while True:
+            batch = list(orphans[count if self.dry_run else 0:][:self.batch_size])
+            if not batch:
+                break
+            for pending_video in batch:
+                if pending_video.file and self.raw_videos_storage.exists(pending_video.file.name):
+                    reclaimed += self.raw_videos_storage.size(pending_video.file.name)
+                    if not self.dry_run:
+                        self.raw_videos_storage.delete(pending_video.file.name)
+                if pending_video.file_upload is not None:
+                    reclaimed += pending_video.file_upload.offset
+                    if not self.dry_run:
+                        pending_video.file_upload.delete()
+                if not self.dry_run:
+                    pending_video.delete()
+            count += len(batch)
+        return count, reclaimed
+
+    def get_old_entries(self, folder):
+        if not os.path.isdir(folder):
+            return []
+        modified_before = time.time() - self.ttl
+        entries = []
+        for current_folder, folders, names in os.walk(folder):
+            for name in folders + names:
+                path = os.path.join(current_folder, name)
+                upload_id = self.get_upload_id(name)
+                if upload_id is not None and os.path.getmtime(path) < modified_before:
+                    entries.append((upload_id, path))
+            # the ones named after an upload are handled as a whole
+            folders[:] = [name for name in folders if self.get_upload_id(name) is None]
+        return entries
+
+    def reap_orphaned_files(self, folder):
+        """
+        files and folders named after an upload that does not exist anymore
+        """
+        count = 0
+        reclaimed = 0
+        entries = self.get_old_entries(folder)
+        for index in range(0, len(entries), self.batch_size):
+            batch = entries[index:index + self.batch_size]
+            live_ids = set(FileUpload.objects.filter(pk__in=set(upload_id for upload_id, _ in batch))
+                           .values_list('pk', flat=True))
+            for upload_id, path in batch:
+                if upload_id in live_ids or not os.path.exists(path):
+                    continue
+                reclaimed += self.remove_path(path)
+                count += 1
+        return count, reclaimed
+
+    def reap_lazy_rendition_folders(self, folder=None):
+        """
+        LazyRenditionProcessor work folders untouched for ttl seconds ( a live job keeps writing on its own )
+        """
+        folder = folder or tempfile.gettempdir()
+        modified_before = time.time() - self.ttl
+        count = 0
+        reclaimed = 0
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if not name.startswith(LazyRenditionProcessor.WORK_FOLDER_PREFIX) or not os.path.isdir(path) \
+                    or os.path.getmtime(path) >= modified_before:
+                continue
+            reclaimed += self.remove_path(path)
+            count += 1
+        return count, reclaimed
+
+    def reap_unreferenced_raw_videos(self):
+        if not isinstance(self.raw_videos_storage, FileSystemStorage):
+            return 0, 0
+        folder = self.raw_videos_storage.path('raw_videos')
+        if not os.path.isdir(folder):
+            return 0, 0
+        modified_before = time.time() - self.ttl
+        count = 0
+        reclaimed = 0
+        names = [name for name in os.listdir(folder)
+                 if os.path.isfile(os.path.join(folder, name)) and os.path.getmtime(os.path.join(folder, name)) < modified_before]
+        for index in range(0, len(names), self.batch_size):
+            batch = names[index:index + self.batch_size]
+            referenced = set(ExamPendingRequestVideo.objects
+                             .filter(file__in=['raw_videos/' + name for name in batch])
+                             .values_list('file', flat=True))
+            for name in batch:
+                if 'raw_videos/' + name in referenced:
+                    continue
+                reclaimed += self.remove_path(os.path.join(folder, name))
+                count += 1
+        return count, reclaimed
+
+    def reap(self):
+        """
+        returns a dict with the count and bytes reclaimed per kind
+        """
+        report = {
+            'stale_uploads': self.reap_stale_uploads(),
+            'orphaned_raw_videos': self.reap_orphaned_raw_videos(),
+            'unreferenced_raw_videos': self.reap_unreferenced_raw_videos(),
+            'temp_files': (0, 0),
+        }
+        folders = [settings.TRANSCODING_WORK_DIR]
+        if isinstance(self.storage, FileSystemStorage):
+            # chunked_uploads/%Y/%m/%d, scanned from its fixed part
+            folders.append(self.storage.path(UPLOAD_PATH.split('%')[0]))
+        for folder in folders:
+            count, reclaimed = self.reap_orphaned_files(folder)
+            report['temp_files'] = (report['temp_files'][0] + count, report['temp_files'][1] + reclaimed)
+        report['lazy_rendition_folders'] = self.reap_lazy_rendition_folders()
+
+        self.logger.info("UploadReaper - {dry_run}reclaimed {size} bytes: {report}".format(
+            dry_run='( dry run ) ' if self.dry_run else '',
+            size=sum(reclaimed for _, reclaimed in report.values()),
+            report=", ".join("{kind} {count} ( {size} bytes )".format(kind=kind, count=count, size=size)
+                             for kind, (count, size) in report.items())))
+        return report
@@ -17,6 +17,9 @@ from .device_users_groups import ReadDeviceUsersGroupSerializer, WriteableDevice
 
 from .news import ReadNewsSerializer, WriteNewsSerializer
 
-from .exam_pending_requests import ExamPendingRequestWriteSerializer, ExamPendingRequestVideoWriteSerializer
+from .exam_pending_requests import ExamPendingRequestWriteSerializer, ExamPendingRequestVideoWriteSerializer, \
+    ExamPendingRequestReadSerializer, ExamPendingRequestPrioritySerializer
 
-from .file_uploads import FileUploadSerializer
\ No newline at end of file
+from .file_uploads import FileUploadSerializer
+
+from .transcoding_metrics import TranscodingMetricReadSerializer
\ No newline at end of file
@@ -3,6 +3,8 @@ from rest_framework import serializers
 
 from api.models import ModelValidationException
 from ..models import ExamPendingRequestVideo, ExamPendingRequest, User, Device, Exercise
+from .devices import ReadDeviceSerializerMin
+from .exercises import ReadExerciseSerializerMin
 
 
 class ExamPendingRequestVideoWriteSerializer(serializers.ModelSerializer):
@@ -25,10 +27,38 @@ class ExamPendingRequestWriteSerializer(serializers.ModelSerializer):
             raise ModelValidationException(
                 _("user {user_id} is not allowed to use device {device_id}").format(user_id=taker.id,
                                                                                     device_id=device.id))
+        validated_data['priority'] = ExamPendingRequest.get_default_priority(validated_data.get('exercise'))
         instance = ExamPendingRequest.objects.create(**validated_data)
 
         return instance.set_taker(taker).set_device(device)
 
     class Meta:
         model = ExamPendingRequest
-        fields = ('taker', 'exercise', 'device', 'duration' )
\ No newline at end of file
+        fields = ('taker', 'exercise', 'device', 'duration' )
+
+class ExamPendingRequestReadSerializer(serializers.ModelSerializer):
+    exercise = ReadExerciseSerializerMin()
+    device = ReadDeviceSerializerMin()
+    # position on the transcoding queue ( 1 is next ) and estimated seconds until it is done, null once claimed
+    queue_position = serializers.SerializerMethodField()
+    eta = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExamPendingRequest
+        fields = ('id', 'created', 'modified', 'duration', 'exercise', 'device', 'status', 'priority',
+                  'attempts', 'is_processed', 'queue_position', 'eta')
+
+    def get_queue_position(self, pending_exam):
+        position = self.context.get('queue_positions', {}).get(pending_exam.id)
+        return position[0] if position is not None else None
+
+    def get_eta(self, pending_exam):
+        position = self.context.get('queue_positions', {}).get(pending_exam.id)
+        return position[1] if position is not None else None
+
+
+class ExamPendingRequestPrioritySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = ExamPendingRequest
+        fields = ('priority', )
@@ -20,16 +20,26 @@ class NullableExamSerializer(serializers.ModelSerializer):
 
 
 class VideoExamReadSerializer(serializers.ModelSerializer):
+    """
+    lazy renditions have no url until they are generated, playing them ( PUT videos/<pk>/play?type=<mime type> )
+    requests them, listings never do so a page does not queue a transcode per exam
+    """
 
     video_url = serializers.SerializerMethodField()
+    # segmented ( HLS/DASH ) playlist, playback starts and seeks without downloading the whole file
+    is_streaming = serializers.SerializerMethodField()
 
     class Meta:
         model = ExamVideo
-        fields = ('id', 'created', 'modified', 'video_url', 'type', 'views')
+        fields = ('id', 'created', 'modified', 'video_url', 'type', 'views', 'is_streaming',
+                  'variant', 'width', 'height', 'bitrate', 'status')
+
+    def get_is_streaming(self, video):
+        return video.is_streaming()
 
     def get_video_url(self, video):
         request = self.context.get('request')
-        if not video.file:
+        if not video.file or not video.is_ready():
             return None
         video_url = video.file.url
         return request.build_absolute_uri(video_url)
@@ -40,13 +50,34 @@ class Exam2VideoReadSerializer(serializers.ModelSerializer):
     videos = VideoExamReadSerializer(many=True, read_only=True)
     exercise = ReadExerciseSerializer()
     device = ReadDeviceSerializer()
+    poster_url = serializers.SerializerMethodField()
+    # seek bar preview, tile n ( left to right, top to bottom ) covers [n * interval, (n + 1) * interval) seconds
+    sprite = serializers.SerializerMethodField()
 
     class Meta:
         model = Exam
         fields = ('id', 'created', 'modified', 'duration', 'taker',
-                  'exercise', 'device', 'videos', 'video_views'
+                  'exercise', 'device', 'videos', 'video_views', 'poster_url', 'sprite'
                   )
 
+    def get_poster_url(self, exam):
+        request = self.context.get('request')
+        if not exam.poster:
+            return None
+        return request.build_absolute_uri(exam.poster.url)
+
+    def get_sprite(self, exam):
+        request = self.context.get('request')
+        if not exam.sprite:
+            return None
+        return {
+            'url': request.build_absolute_uri(exam.sprite.url),
+            'interval': exam.sprite_interval,
+            'columns': exam.sprite_columns,
+            'tile_width': exam.sprite_tile_width,
+            'tile_height': exam.sprite_tile_height
+        }
+
 
 class ExamReadSerializerList(serializers.ModelSerializer):
     taker = ReadUserSerializerMin()
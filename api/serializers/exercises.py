@@ -16,13 +16,24 @@ class ReadTutorialSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         videos = []
         for instance in tutorial.exams.all():
+            poster_url = request.build_absolute_uri(instance.poster.url) if instance.poster else None
+            sprite_url = request.build_absolute_uri(instance.sprite.url) if instance.sprite else None
             for video in instance.videos.all():
-                if not video.file:
+                # lazy renditions are listed once generated ( see VideoExamReadSerializer )
+                if not video.file or not video.is_ready():
                     continue
                 video_url = video.file.url
                 videos.append({
                     'video_url': request.build_absolute_uri(video_url),
-                    'type': video.type
+                    'poster_url': poster_url,
+                    'sprite_url': sprite_url,
+                    'sprite_interval': instance.sprite_interval,
+                    'sprite_columns': instance.sprite_columns,
+                    'type': video.type,
+                    'is_streaming': video.is_streaming(),
+                    'variant': video.variant,
+                    'height': video.height,
+                    'bitrate': video.bitrate
                 })
         return videos
 
@@ -7,11 +7,13 @@ class FileUploadSerializer(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
 
     def get_url(self, obj):
-        return reverse('exams-upload-details',
+        return reverse('exams-upload-parallel-details' if obj.is_parallel() else 'exams-upload-details',
                        kwargs={'pk': obj.id},
                        request=self.context['request'])
 
     class Meta:
         model = FileUpload
-        fields = '__all__'
-        read_only_fields = ('status', 'completed_at')
\ No newline at end of file
+        exclude = ('content_hash_state', 'md5_state')
+        # chunk_size / expected_size are only set by ParallelFileUploadView on creation
+        read_only_fields = ('status', 'completed_at', 'expected_size', 'chunk_size', 'progressive_status',
+                            'progressive_claimed_by', 'progressive_claimed_at', 'content_hash', 'md5_checksum')
\ No newline at end of file
@@ -0,0 +1,15 @@
+from rest_framework import serializers
+from ..models import TranscodingMetric
+
+
+class TranscodingMetricReadSerializer(serializers.ModelSerializer):
+    stages = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TranscodingMetric
+        fields = ('id', 'created', 'pending_request', 'worker', 'attempt', 'file_name', 'renditions', 'preset',
+                  'queue_wait', 'wall_time', 'speed', 'decode_fps', 'encode_fps', 'stages',
+                  'input_bytes', 'output_bytes', 'succeeded', 'final_message')
+
+    def get_stages(self, metric):
+        return metric.get_stages()
@@ -1,6 +1,19 @@
 from ..models import User
 from ..models import Device
 from ..models import ModelValidationException
+from ..models import ExamPendingRequest
+from ..models import TranscodingMetric
+from ..models import ExamVideo
+from ..models import FileUpload
+from ..utils.resumable_hash import ResumableHash
+from ..utils.composable_storage import ComposableFileSystemStorage
+from ..processors import UploadReaper
+from ..utils.upload_load_test import UploadLoadTestResult
+from django.core.files.base import ContentFile
+import hashlib
+import os
+import tempfile
+import uuid
 from django.test import TestCase
 from django.utils.translation import ugettext_lazy as _
 
@@ -47,4 +60,168 @@ class TestModels(TestCase):
             device.add_admin(student)
 
         the_exception = cm.exception
-        self.assertEqual(str (the_exception), _("no more available free slots"))
\ No newline at end of file
+        self.assertEqual(str (the_exception), _("no more available free slots"))
+
+    def test_exam_pending_request_fails_after_max_attempts(self):
+        pending_exam = ExamPendingRequest.objects.create(duration=10)
+
+        pending_exam.claim('worker#1')
+        pending_exam.mark_as_failed('error#1', max_attempts=2)
+        self.assertEqual(pending_exam.attempts, 1)
+        self.assertFalse(pending_exam.is_failed())
+
+        pending_exam.claim('worker#2')
+        pending_exam.mark_as_failed('error#2', max_attempts=2)
+        self.assertEqual(pending_exam.attempts, 2)
+        self.assertTrue(pending_exam.is_failed())
+        self.assertEqual(pending_exam.last_error, 'error#2')
+
+    def test_transcoding_metric_stats(self):
+        metric = TranscodingMetric()
+        metric.set_stats({
+            'wall_time': 5.0,
+            'frames': {'jpegdec0': 500, 'x264enc0': 500, 'vp8enc0': 250, 'thumbnails': 5},
+            'fps': {'jpegdec0': 100.0, 'x264enc0': 100.0, 'vp8enc0': 50.0, 'thumbnails': 1.0},
+            'input_bytes': 1000,
+            'output_bytes': 500,
+            'final_message': 'EOS from pipeline0',
+        }, duration=20)
+
+        self.assertEqual(metric.decode_fps, 100.0)
+        self.assertEqual(metric.encode_fps, 50.0)
+        self.assertEqual(metric.speed, 4.0)
+        self.assertEqual(metric.get_stages()['vp8enc0'], 50.0)
+
+    def test_lazy_exam_video_generation_is_requested_once(self):
+        video = ExamVideo.objects.create(type=ExamVideo.WEBM, is_lazy=True, status=ExamVideo.LAZY)
+
+        self.assertTrue(video.request_generation())
+        self.assertFalse(video.request_generation())
+
+        claimed = ExamVideo.objects.claim_next_lazy(claim_timeout=600)
+        self.assertEqual(claimed.id, video.id)
+        self.assertEqual(claimed.status, ExamVideo.GENERATING)
+        self.assertIsNone(ExamVideo.objects.claim_next_lazy(claim_timeout=600))
+
+    def test_exam_pending_request_schedule_is_fair_between_devices(self):
+        owner = User.objects.get(id=1)
+        busy_device = Device.objects.create(owner=owner, serial="1234567", slots=3)
+        other_device = Device.objects.create(owner=owner, serial="7654321", slots=3)
+
+        busy_1 = ExamPendingRequest.objects.create(duration=10, device=busy_device)
+        busy_2 = ExamPendingRequest.objects.create(duration=10, device=busy_device)
+        other = ExamPendingRequest.objects.create(duration=10, device=other_device)
+        urgent = ExamPendingRequest.objects.create(duration=10, device=busy_device, priority=ExamPendingRequest.HIGH)
+
+        schedule = [pending_exam_id for pending_exam_id, _duration in ExamPendingRequest.objects.schedule(600)]
+        self.assertEqual(schedule, [urgent.id, busy_1.id, other.id, busy_2.id])
+
+        positions = ExamPendingRequest.objects.queue_positions(600, seconds_per_second=0.5)
+        self.assertEqual(positions[other.id], (3, 15))
+
+    def test_exam_pending_request_postpone_keeps_attempts(self):
+        pending_exam = ExamPendingRequest.objects.create(duration=10)
+
+        pending_exam.claim('worker#1')
+        pending_exam.postpone()
+        self.assertEqual(pending_exam.attempts, 0)
+        self.assertIsNone(pending_exam.claimed_by)
+
+    def test_exam_pending_request_claim_next_skips_postponed(self):
+        first = ExamPendingRequest.objects.create(duration=10)
+        second = ExamPendingRequest.objects.create(duration=10)
+
+        claimed = ExamPendingRequest.objects.claim_next('worker#1', 600)
+        self.assertEqual(claimed.id, first.id)
+        claimed.postpone()
+        claimed.save()
+
+        claimed = ExamPendingRequest.objects.claim_next('worker#1', 600, exclude=[first.id])
+        self.assertEqual(claimed.id, second.id)
+
+    def test_resumable_hash_goes_on_from_a_saved_state(self):
+        content_hash = ResumableHash('sha256')
+        content_hash.update(b'chunk#1')
+        # as if the next chunk arrived to other process
+        content_hash = ResumableHash('sha256', content_hash.get_state())
+        content_hash.update(b'chunk#2')
+
+        self.assertEqual(content_hash.hexdigest(), hashlib.sha256(b'chunk#1chunk#2').hexdigest())
+
+    def test_resumable_hash_rejects_a_state_of_other_library_version(self):
+        content_hash = ResumableHash('md5')
+        content_hash.update(b'chunk#1')
+        state = content_hash.get_state()
+        tag = ResumableHash.get_tag('md5')
+        foreign_state = b'md5:0:92:' + state[len(tag):]
+
+        self.assertTrue(ResumableHash.is_valid_state('md5', state))
+        self.assertFalse(ResumableHash.is_valid_state('md5', foreign_state))
+        self.assertFalse(ResumableHash.is_valid_state('sha256', state))
+        self.assertFalse(ResumableHash.is_valid_state('md5', None))
+        with self.assertRaises(ValueError):
+            ResumableHash('md5', foreign_state)
+
+        file_upload = FileUpload(md5_state=foreign_state)
+        file_upload._update_hashes(ContentFile(b'chunk#2'), None, foreign_state)
+        self.assertIsNone(file_upload.md5_state)
+
+    def test_parallel_file_upload_chunks(self):
+        file_upload = FileUpload(expected_size=10 * 1024 + 1, chunk_size=1024)
+
+        self.assertTrue(file_upload.is_parallel())
+        self.assertEqual(file_upload.get_chunks_count(), 11)
+        self.assertEqual(file_upload.get_chunk_size(0), 1024)
+        self.assertEqual(file_upload.get_chunk_size(10), 1)
+
+    def test_composable_storage_composes_on_one_of_its_sources(self):
+        storage = ComposableFileSystemStorage(location=tempfile.mkdtemp())
+        storage.save('upload.part', ContentFile(b'chunk#1'))
+        storage.save('upload_chunks/000001', ContentFile(b'chunk#2'))
+
+        storage.compose(['upload.part', 'upload_chunks/000001'], 'upload.part')
+        with storage.open('upload.part', 'rb') as composed:
+            self.assertEqual(composed.read(), b'chunk#1chunk#2')
+
+    def test_upload_reaper_removes_files_of_missing_uploads_only(self):
+        folder = tempfile.mkdtemp()
+        live = FileUpload.objects.create(filename='live.mkv')
+        orphan_id = uuid.uuid4()
+        for name in [str(live.id) + '.mp4', str(orphan_id) + '.mp4', str(orphan_id) + '_720p.mp4', 'unrelated.mp4']:
+            with open(os.path.join(folder, name), 'wb') as output:
+                output.write(b'0' * 10)
+            os.utime(os.path.join(folder, name), (0, 0))
+
+        count, reclaimed = UploadReaper(ttl=60, batch_size=2, claim_timeout=60).reap_orphaned_files(folder)
+
+        self.assertEqual((count, reclaimed), (2, 20))
+        self.assertEqual(sorted(os.listdir(folder)), sorted([str(live.id) + '.mp4', 'unrelated.mp4']))
+
+    def test_upload_load_test_report(self):
+        result = UploadLoadTestResult(devices=2)
+        for latency in range(1, 101):
+            result.add_request(latency / 1000.0, 200, size=1024)
+        result.add_request(1.0, 503)
+        result.wall_time = 1.0
+
+        report = result.get_report()
+        self.assertEqual(report['p50'], 0.051)
+        self.assertEqual(report['p99'], 0.1)
+        self.assertEqual(report['throughput'], 100 * 1024)
+        self.assertEqual(report['status_codes'], {200: 100, 503: 1})
+
+    def test_upload_reaper_removes_old_lazy_rendition_folders(self):
+        folder = tempfile.mkdtemp()
+        old_folder = tempfile.mkdtemp(prefix='lazy_rendition_', dir=folder)
+        with open(os.path.join(old_folder, 'source.mp4'), 'wb') as source:
+            source.write(b'0' * 10)
+        os.utime(old_folder, (0, 0))
+        new_folder = tempfile.mkdtemp(prefix='lazy_rendition_', dir=folder)
+        other_folder = tempfile.mkdtemp(prefix='other_', dir=folder)
+        os.utime(other_folder, (0, 0))
+
+        count, reclaimed = UploadReaper(ttl=60, batch_size=2, claim_timeout=60).reap_lazy_rendition_folders(folder)
+
+        self.assertEqual((count, reclaimed), (1, 10))
+        self.assertEqual(sorted(os.listdir(folder)), sorted([os.path.basename(new_folder),
+                                                             os.path.basename(other_folder)]))
@@ -0,0 +1,77 @@
+from ..models import ExamPendingRequest, Exercise
+from ..processors import ExamPendingRequestProcessor
+from ..video_utils.probe import MediaInfo
+from django.test import TestCase, override_settings
+
+
+class TestProcessors(TestCase):
+
+    def test_verify_duration_keeps_the_device_one_if_it_could_not_be_probed(self):
+        pending_exam = ExamPendingRequest.objects.create(duration=120)
+        processor = ExamPendingRequestProcessor()
+        processor.media_infos = {'video.mkv': MediaInfo(duration=0, codec='image/jpeg', width=1280, height=720,
+                                                        framerate=30)}
+
+        processor.verify_duration(pending_exam)
+
+        pending_exam.refresh_from_db()
+        self.assertEqual(pending_exam.duration, 120)
+
+    def test_verify_duration_fixes_the_device_one(self):
+        pending_exam = ExamPendingRequest.objects.create(duration=120)
+        processor = ExamPendingRequestProcessor()
+        processor.media_infos = {'video.mkv': MediaInfo(duration=95.4, codec='image/jpeg', width=1280, height=720,
+                                                        framerate=30)}
+
+        processor.verify_duration(pending_exam)
+
+        pending_exam.refresh_from_db()
+        self.assertEqual(pending_exam.duration, 95)
+
+    def test_webm_is_not_streamed(self):
+        processor = ExamPendingRequestProcessor()
+        processor.stream_upload = True
+        processor.renditions = list(ExamPendingRequestProcessor.RENDITIONS)
+
+        self.assertTrue(processor.is_streamed('ogg'))
+        self.assertTrue(processor.is_streamed('mp4'))
+        self.assertFalse(processor.is_streamed('webm'))
+
+    @override_settings(EXAM_VIDEO_LADDER=[
+        {'name': '1080p', 'width': 1920, 'height': 1080, 'bitrate': 5000},
+        {'name': '720p', 'width': 1280, 'height': 720, 'bitrate': 2500},
+        {'name': '360p', 'width': 640, 'height': 360, 'bitrate': 800},
+    ])
+    def test_variants_taller_than_the_source_are_skipped(self):
+        processor = ExamPendingRequestProcessor()
+        processor.media_infos = {
+            'camera_1.mkv': MediaInfo(duration=10, codec='image/jpeg', width=1280, height=720, framerate=30),
+            'camera_2.mkv': MediaInfo(duration=10, codec='image/jpeg', width=1920, height=1080, framerate=30),
+        }
+
+        self.assertEqual([variant['name'] for variant in processor.get_variants()], ['720p', '360p'])
+
+        # unknown source height, the whole ladder
+        processor.media_infos = {
+            'camera_1.mkv': MediaInfo(duration=10, codec='image/jpeg', width=None, height=None, framerate=30),
+        }
+        self.assertEqual(len(processor.get_variants()), 3)
+
+    @override_settings(TRANSCODING_ENCODER_PRESET='default',
+                       TRANSCODING_ENCODER_PRESETS_BY_EXERCISE_TYPE={'tutorial': 'quality'},
+                       TRANSCODING_ENCODER_PRESETS_BY_QUEUE_DEPTH=[(3, 'fast'), (5, 'fastest')])
+    def test_encoder_preset_by_exercise_type_and_queue_depth(self):
+        processor = ExamPendingRequestProcessor()
+        regular = ExamPendingRequest(duration=10, exercise=Exercise(type=Exercise.REGULAR))
+        tutorial = ExamPendingRequest(duration=10, exercise=Exercise(type=Exercise.TUTORIAL))
+
+        self.assertEqual(processor.get_encoder_preset(regular), 'default')
+        self.assertEqual(processor.get_encoder_preset(tutorial), 'quality')
+
+        for _ in range(3):
+            ExamPendingRequest.objects.create(duration=10)
+        self.assertEqual(processor.get_encoder_preset(tutorial), 'fast')
+
+        for _ in range(2):
+            ExamPendingRequest.objects.create(duration=10)
+        self.assertEqual(processor.get_encoder_preset(tutorial), 'fastest')
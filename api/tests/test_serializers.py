@@ -1,7 +1,7 @@
 from ..models import User
 from ..models import Device
 from django.test import TestCase
-from ..serializers import WriteableDeviceSerializer
+from ..serializers import WriteableDeviceSerializer, FileUploadSerializer
 
 
 class TestSerializers(TestCase):
@@ -51,3 +51,8 @@ class TestSerializers(TestCase):
 
         return device
 
+    def test_file_upload_chunk_size_is_read_only(self):
+        serializer = FileUploadSerializer(data={'filename': 'video.mkv', 'chunk_size': 1024, 'expected_size': 4096})
+        self.assertTrue(serializer.is_valid())
+        self.assertNotIn('chunk_size', serializer.validated_data)
+        self.assertNotIn('expected_size', serializer.validated_data)
@@ -0,0 +1,85 @@
+from ..video_utils.benchmark import get_transcoder_classes
+from ..video_utils.hls import write_hls_master_playlist
+from ..video_utils.streaming_upload import BlockingStream
+from ..video_utils.thumbnails import build_poster, build_sprite_sheet
+from ..video_utils.transcoding_gs import MKV2OGGTranscoder, MKV2WEBMTranscoder, MKV2MP4Transcoder, \
+    MKV2MultiTranscoder, ProgressiveMKV2MultiTranscoder, SegmentsJoinTranscoder, MP42MultiTranscoder
+import os
+import tempfile
+from django.test import SimpleTestCase
+from PIL import Image
+
+
+class TestVideoUtils(SimpleTestCase):
+
+    def test_benchmark_transcoder_classes_are_the_mkv_ones(self):
+        transcoder_classes = get_transcoder_classes()
+
+        for transcoder_class in (MKV2OGGTranscoder, MKV2WEBMTranscoder, MKV2MP4Transcoder, MKV2MultiTranscoder):
+            self.assertIn(transcoder_class, transcoder_classes)
+        for transcoder_class in (ProgressiveMKV2MultiTranscoder, SegmentsJoinTranscoder, MP42MultiTranscoder):
+            self.assertNotIn(transcoder_class, transcoder_classes)
+
+    def test_hls_master_playlist_bandwidth_is_measured_from_the_segments(self):
+        folder = tempfile.mkdtemp()
+        os.makedirs(os.path.join(folder, '720p'))
+        for name, size in (('segment_0.ts', 1000), ('segment_1.ts', 3000)):
+            with open(os.path.join(folder, '720p', name), 'wb') as segment:
+                segment.write(b'0' * size)
+        playlist_file = os.path.join(folder, '720p', 'playlist.m3u8')
+        with open(playlist_file, 'w') as playlist:
+            playlist.write("#EXTM3U\n#EXTINF:2.0,\nsegment_0.ts\n#EXTINF:2.0,\nsegment_1.ts\n#EXT-X-ENDLIST\n")
+        master_file = os.path.join(folder, 'master.m3u8')
+
+        write_hls_master_playlist(master_file, [(playlist_file, 1280, 720)])
+
+        with open(master_file) as master:
+            self.assertEqual(master.read().splitlines(), [
+                '#EXTM3U',
+                '#EXT-X-VERSION:3',
+                '#EXT-X-STREAM-INF:BANDWIDTH=12000,AVERAGE-BANDWIDTH=8000,RESOLUTION=1280x720',
+                '720p/playlist.m3u8',
+            ])
+
+    def build_thumbnails(self, folder, colors):
+        thumbnail_files = []
+        for index, color in enumerate(colors):
+            thumbnail_file = os.path.join(folder, "thumb_{index:05d}.jpg".format(index=index))
+            Image.new('RGB', (64, 36), color).save(thumbnail_file, 'JPEG')
+            thumbnail_files.append(thumbnail_file)
+        return thumbnail_files
+
+    def test_sprite_sheet_tiles_left_to_right_top_to_bottom(self):
+        folder = tempfile.mkdtemp()
+        colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 255), (0, 0, 0)]
+        thumbnail_files = self.build_thumbnails(folder, colors)
+        sprite_file = os.path.join(folder, 'sprite.jpg')
+
+        self.assertTrue(build_sprite_sheet(thumbnail_files, sprite_file, columns=3, tile_width=32, tile_height=18))
+
+        with Image.open(sprite_file) as sprite:
+            self.assertEqual(sprite.size, (3 * 32, 2 * 18))
+            for index, color in enumerate(colors):
+                # center of the tile, jpeg is lossy
+                pixel = sprite.getpixel(((index % 3) * 32 + 16, (index // 3) * 18 + 9))
+                self.assertTrue(all(abs(channel - expected) < 40 for channel, expected in zip(pixel, color)))
+
+    def test_poster_skips_the_first_thumbnails(self):
+        folder = tempfile.mkdtemp()
+        thumbnail_files = self.build_thumbnails(folder, [(0, 0, 0)] * 10 + [(255, 255, 255)] * 10)
+        poster_file = os.path.join(folder, 'poster.jpg')
+
+        self.assertTrue(build_poster(thumbnail_files, poster_file, position=0.5))
+        self.assertFalse(build_poster([], poster_file))
+
+        with Image.open(poster_file) as poster:
+            self.assertTrue(all(channel > 200 for channel in poster.getpixel((32, 18))))
+
+    def test_blocking_stream_first_close_wins(self):
+        stream = BlockingStream(max_size=16)
+        stream.write(b'rendition')
+        stream.close()
+        # the failure cleanup does not turn a finished stream on a failed one
+        stream.close(error="transcoding failed")
+
+        self.assertEqual(stream.read(), b'rendition')
@@ -1,7 +1,9 @@
 from django.urls import path
 from rest_framework_jwt.views import (obtain_jwt_token, refresh_jwt_token)
 
-from .views import FileUploadView, VideosListAPIView, VideosUsersAPIView, VideoPlayAPIView
+from .views import FileUploadView, ParallelFileUploadView, VideosListAPIView, VideosUsersAPIView, VideoPlayAPIView
+from .views import TranscodingMetricsListAPIView, TranscodingMetricsReportView
+from .views import ExamPendingRequestListAPIView, ExamPendingRequestRetrieveAPIView, ExamPendingRequestPriorityAPIView
 from .views import ExerciseListCreateAPIView, ExerciseRetrieveUpdateDestroyAPIView, DeviceOpenRegistrationView, \
     ExamListCreateAPIView, \
     ExamRetrieveUpdateDestroyAPIView, DeviceOpenLocalStreamingStartView, DeviceOpenLocalStreamingEndsView, \
@@ -75,6 +77,10 @@ urlpatterns = [
     # exams
     path('exams/upload', FileUploadView.as_view(), name='exams-upload'),
     path('exams/upload/<uuid:pk>', FileUploadView.as_view(), name='exams-upload-details'),
+    path('exams/upload/parallel', ParallelFileUploadView.as_view(), name='exams-upload-parallel'),
+    path('exams/upload/parallel/<uuid:pk>', ParallelFileUploadView.as_view(), name='exams-upload-parallel-details'),
+    path('exams/upload/parallel/<uuid:pk>/chunks/<int:index>', ParallelFileUploadView.as_view(),
+         name='exams-upload-parallel-chunks'),
     path('exams', ExamListCreateAPIView.as_view(), name='exams-list-create'),
     path('exams/<int:pk>', ExamRetrieveUpdateDestroyAPIView.as_view(), name='exams-retrieve-update-destroy'),
     path('streaming/validate', ValidateExamStreamingSignedUrlView.as_view(), name='validate-streaming'),
@@ -82,6 +88,17 @@ urlpatterns = [
     path('videos', VideosListAPIView.as_view(), name='videos-list'),
     path('videos/<int:pk>/play', VideoPlayAPIView.as_view(), name='videos-play'),
     path('videos/<int:pk>/users/<int:user_id>/share', VideosUsersAPIView.as_view(), name='videos-users'),
+    # transcoding queue
+    path('exams/pending-requests', ExamPendingRequestListAPIView.as_view(), name='exam-pending-requests-list'),
+    path('exams/pending-requests/<int:pk>', ExamPendingRequestRetrieveAPIView.as_view(),
+         name='exam-pending-requests-details'),
+    path('exams/pending-requests/<int:pk>/priority', ExamPendingRequestPriorityAPIView.as_view(),
+         name='exam-pending-requests-priority'),
+    # transcoding telemetry
+    path('transcoding-metrics', TranscodingMetricsListAPIView.as_view(), name='transcoding-metrics-list'),
+    path('transcoding-metrics/report', TranscodingMetricsReportView.as_view(), name='transcoding-metrics-report'),
+    path('exams/pending-requests/<int:pk>/transcoding-metrics', TranscodingMetricsListAPIView.as_view(),
+         name='exam-pending-request-transcoding-metrics'),
     # news
     path('news', NewsListCreateAPIView.as_view(), name="news-list-create"),
     path('news/<int:pk>', NewsRetrieveUpdateDestroyAPIView.as_view(), name="news-retrieve-update-destroy")
@@ -0,0 +1,67 @@
+import os
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from storages.backends.gcloud import GoogleCloudStorage
+
+
+class ComposableFileSystemStorage(FileSystemStorage):
+    """
+    local disk stand in of ComposableGoogleCloudStorage ( tests / single node setups ), the upload chunks are
+    kept as separated files and concatenated once the upload is completed
+    """
+
+    def compose(self, names, name):
+        """
+        concatenates names on name, which could be one of them
+        """
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = path + '.compose'
+        with open(temporary_path, 'wb') as destination:
+            for source_name in names:
+                with self.open(source_name, 'rb') as source:
+                    for data in source.chunks():
+                        destination.write(data)
+        os.replace(temporary_path, path)
+
+
+class ComposableGoogleCloudStorage(GoogleCloudStorage):
+    """
+    uploads bucket, the chunks are stored as objects and composed server side once the upload is
+    completed, so web nodes do not keep any state on their disk and any worker could fetch the source
+    """
+    # sources allowed by a single compose request, bigger lists are composed on rounds
+    MAX_COMPOSE_SOURCES = 32
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('bucket_name', settings.GS_UPLOAD_BUCKET_NAME)
+        super().__init__(**kwargs)
+
+    def _compose(self, blobs, name):
+        blob = self.bucket.blob(self._normalize_name(name))
+        # compose fails if the destination has no content type
+        blob.content_type = 'application/octet-stream'
+        blob.compose(blobs)
+        return blob
+
+    def compose(self, names, name):
+        """
+        concatenates names on name, which could be one of them
+        """
+        blobs = [self.bucket.blob(self._normalize_name(source_name)) for source_name in names]
+        intermediates = []
+        step = 0
+        while len(blobs) > ComposableGoogleCloudStorage.MAX_COMPOSE_SOURCES:
+            composed = []
+            for index in range(0, len(blobs), ComposableGoogleCloudStorage.MAX_COMPOSE_SOURCES):
+                blob = self._compose(
+                    blobs[index:index + ComposableGoogleCloudStorage.MAX_COMPOSE_SOURCES],
+                    "{name}.compose/{step:02d}_{index:06d}".format(name=name, step=step, index=index)
+                )
+                composed.append(blob)
+            intermediates.extend(composed)
+            blobs = composed
+            step += 1
+        self._compose(blobs, name)
+        for blob in intermediates:
+            blob.delete()
@@ -0,0 +1,71 @@
+import shutil
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F, Sum
+from django.utils import timezone
+from drf_chunked_upload.settings import EXPIRATION_DELTA
+from ..models import FileUpload, ExamPendingRequest, ExamPendingRequestVideo
+
+
+class DiskSpaceMonitor:
+    """
+    admission control for the volume where uploads and renditions are written, new work is only
+    admitted if its expected footprint fits on the free space minus the footprint of the work in
+    progress ( bytes left of the incomplete uploads, renditions of the requests being transcoded )
+    and min_free bytes. the work in progress is taken from the db, so all processes see the same
+    """
+
+    def __init__(self, path, min_free, footprint_factor, claim_timeout):
+        self.path = path
+        self.min_free = min_free
+        self.footprint_factor = footprint_factor
+        self.claim_timeout = claim_timeout
+
+    def get_free_space(self):
+        return shutil.disk_usage(self.path).free
+
+    @staticmethod
+    def uploads_use_disk():
+        # uploads kept on an object storage only reach the disk once downloaded by a worker
+        return isinstance(FileUpload._meta.get_field('file').storage, FileSystemStorage)
+
+    def get_uploads_footprint(self, exclude_upload_id=None):
+        if not self.uploads_use_disk():
+            return 0
+        uploads = FileUpload.objects.filter(status=FileUpload.UPLOADING,
+                                            created_at__gt=timezone.now() - EXPIRATION_DELTA,
+                                            expected_size__gt=F('offset'))
+        if exclude_upload_id is not None:
+            uploads = uploads.exclude(pk=exclude_upload_id)
+        return uploads.aggregate(size=Sum(F('expected_size') - F('offset')))['size'] or 0
+
+    def get_transcoding_footprint(self, pending_exam):
+        source_size = pending_exam.videos.aggregate(size=Sum('file_upload__offset'))['size'] or 0
+        return int(source_size * self.footprint_factor)
+
+    def get_transcodings_footprint(self, exclude_pending_exam_id=None):
+        # renditions already partially written are counted twice, it errs on the safe side
+        pending_exams = ExamPendingRequest.objects.in_progress(self.claim_timeout)
+        if exclude_pending_exam_id is not None:
+            pending_exams = pending_exams.exclude(pk=exclude_pending_exam_id)
+        source_size = ExamPendingRequestVideo.objects.filter(request__in=pending_exams)\
+            .aggregate(size=Sum('file_upload__offset'))['size'] or 0
+        return int(source_size * self.footprint_factor)
+
+    def get_available_space(self, exclude_upload_id=None, exclude_pending_exam_id=None):
+        return self.get_free_space() - self.min_free \
+               - self.get_uploads_footprint(exclude_upload_id) \
+               - self.get_transcodings_footprint(exclude_pending_exam_id)
+
+    def can_upload(self, size, upload_id=None):
+        if not self.uploads_use_disk():
+            return True
+        return self.get_available_space(exclude_upload_id=upload_id) >= size
+
+    def can_transcode(self, pending_exam=None):
+        """
+        without a request only checks that the volume is not already below min_free
+        """
+        if pending_exam is None:
+            return self.get_available_space() >= 0
+        return self.get_available_space(exclude_pending_exam_id=pending_exam.id) \
+            >= self.get_transcoding_footprint(pending_exam)
@@ -0,0 +1,109 @@
+import ctypes
+import ctypes.util
+
+
+class ResumableHash:
+    """
+    md5/sha256 whose state can be saved ( ex: on a db row ) and restored on other process, so a file
+    uploaded on chunks is hashed as they arrive, whatever process receives each one. backed by the
+    libcrypto ( OpenSSL ) low level api, whose context structs hold the whole state. the saved state is
+    tagged with the algorithm, the library version and the struct size, as the struct layout is private to
+    the library, a state saved by other version ( ex: a node upgraded in the middle of an upload ) is not valid
+    """
+
+    # algorithm -> ( libcrypto functions prefix, digest size, context struct size ), context buffers are
+    # oversized on purpose
+    ALGORITHMS = {
+        'md5': ('MD5', 16, 92),
+        'sha256': ('SHA256', 32, 112),
+    }
+
+    CONTEXT_SIZE = 256
+
+    _libcrypto = None
+
+    _version = None
+
+    @classmethod
+    def _get_libcrypto(cls):
+        if cls._libcrypto is None:
+            library = ctypes.util.find_library('crypto')
+            cls._libcrypto = ctypes.CDLL(library) if library else False
+            if cls._libcrypto:
+                cls._declare_functions(cls._libcrypto)
+        return cls._libcrypto
+
+    @classmethod
+    def _declare_functions(cls, libcrypto):
+        for prefix, _, _ in cls.ALGORITHMS.values():
+            init = getattr(libcrypto, prefix + '_Init')
+            init.argtypes = [ctypes.c_void_p]
+            init.restype = ctypes.c_int
+            update = getattr(libcrypto, prefix + '_Update')
+            update.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t]
+            update.restype = ctypes.c_int
+            final = getattr(libcrypto, prefix + '_Final')
+            final.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+            final.restype = ctypes.c_int
+        # OpenSSL_version_num from 1.1, SSLeay before it
+        version_num = getattr(libcrypto, 'OpenSSL_version_num', None) or getattr(libcrypto, 'SSLeay')
+        version_num.argtypes = []
+        version_num.restype = ctypes.c_ulong
+        cls._version = version_num()
+
+    @classmethod
+    def is_supported(cls):
+        return bool(cls._get_libcrypto())
+
+    @classmethod
+    def get_tag(cls, algorithm):
+        cls._get_libcrypto()
+        return "{algorithm}:{version:x}:{size}:".format(
+            algorithm=algorithm,
+            version=cls._version or 0,
+            size=cls.ALGORITHMS[algorithm][2]).encode()
+
+    @classmethod
+    def is_valid_state(cls, algorithm, state):
+        """
+        false for missing states and for the ones saved by other library version / algorithm
+        """
+        if state is None or algorithm not in cls.ALGORITHMS or not cls.is_supported():
+            return False
+        return bytes(state).startswith(cls.get_tag(algorithm))
+
+    def __init__(self, algorithm, state=None):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError("ResumableHash - unknown algorithm {algorithm}".format(algorithm=algorithm))
+        if not self.is_supported():
+            raise RuntimeError("ResumableHash - libcrypto is not available")
+        self.algorithm = algorithm
+        prefix, self.digest_size, _ = self.ALGORITHMS[algorithm]
+        self._update = getattr(self._get_libcrypto(), prefix + '_Update')
+        self._final = getattr(self._get_libcrypto(), prefix + '_Final')
+        if state is None:
+            self.context = ctypes.create_string_buffer(self.CONTEXT_SIZE)
+            if not getattr(self._get_libcrypto(), prefix + '_Init')(self.context):
+                raise RuntimeError("ResumableHash - {prefix}_Init failed".format(prefix=prefix))
+        else:
+            if not self.is_valid_state(algorithm, state):
+                raise ValueError("ResumableHash - state was not saved by this library version / algorithm")
+            self.context = ctypes.create_string_buffer(bytes(state)[len(self.get_tag(algorithm)):],
+                                                       self.CONTEXT_SIZE)
+
+    def update(self, data):
+        if not self._update(self.context, bytes(data), len(data)):
+            raise RuntimeError("ResumableHash - {algorithm} update failed".format(algorithm=self.algorithm))
+
+    def get_state(self):
+        return self.get_tag(self.algorithm) + self.context.raw
+
+    def digest(self):
+        # finalizing destroys the context, so it works on a copy and the hash can go on
+        context = ctypes.create_string_buffer(self.context.raw, self.CONTEXT_SIZE)
+        digest = ctypes.create_string_buffer(self.digest_size)
+        self._final(digest, context)
+        return digest.raw
+
+    def hexdigest(self):
+        return self.digest().hex()
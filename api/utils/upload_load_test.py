@@ -0,0 +1,183 @@
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from ..video_utils.benchmark import build_test_clip
+
+
+def percentile(values, rank):
+    """
+    nearest rank percentile, rank on 0..100
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, int(math.ceil(rank / 100.0 * len(values))) - 1)]
+
+
+class UploadLoadTestResult:
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+        self.status_codes = {}
+        self.uploads = 0
+        self.failed_uploads = 0
+        self.uploaded_bytes = 0
+        self.wall_time = 0.0
+        self.lock = threading.Lock()
+
+    def add_request(self, latency, status_code, size=0):
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+            if status_code is None or status_code >= 400:
+                self.errors += 1
+            else:
+                self.uploaded_bytes += size
+
+    def add_upload(self, ok):
+        with self.lock:
+            if ok:
+                self.uploads += 1
+            else:
+                self.failed_uploads += 1
+
+    def get_report(self):
+        return {
+            'devices': self.devices,
+            'uploads': self.uploads,
+            'failed_uploads': self.failed_uploads,
+            'throughput': self.uploaded_bytes / self.wall_time if self.wall_time > 0 else 0.0,
+            'p50': percentile(self.latencies, 50),
+            'p99': percentile(self.latencies, 99),
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+            'status_codes': dict(self.status_codes),
+        }
+
+
+class UploadLoadTest:
+    """
+    simulates devices uploading synthetic recordings ( MJPEG/MKV clips, as the devices record, see build_test_clip )
+    through the chunked upload endpoints of a running server, sequential ( FileUploadView, Content-Range chunks in
+    order ) or parallel ( ParallelFileUploadView, chunks_per_upload concurrent chunks per device ). complete_data
+    ( device, device_mac_address, taker, exercise, duration ) completes the uploads as real exam requests, without
+    it they are left incomplete ( see reap_uploads ). GStreamer must be initialized
+    """
+
+    def __init__(self, base_url, chunk_size, width=640, height=360, seconds=10, parallel=False, chunks_per_upload=4,
+                 complete_data=None, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.width = width
+        self.height = height
+        self.seconds = seconds
+        # every clip moves its pattern at a different speed, so no upload is taken as a duplicate of other
+        self.clips_built = 0
+        self.chunk_size = chunk_size
+        self.parallel = parallel
+        self.chunks_per_upload = chunks_per_upload
+        self.complete_data = complete_data
+        self.timeout = timeout
+
+    def _request(self, result, session, method, url, size=0, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            result.add_request(time.perf_counter() - start, None)
+            return None
+        result.add_request(time.perf_counter() - start, response.status_code, size)
+        return response if response.status_code < 400 else None
+
+    def _complete(self, result, session, url, content):
+        if self.complete_data is None:
+            return True
+        data = dict(self.complete_data, md5=hashlib.md5(content).hexdigest())
+        return self._request(result, session, 'POST', url, data=data) is not None
+
+    def upload_sequential(self, result, session, content, filename):
+        url = self.base_url + '/exams/upload'
+        for start in range(0, len(content), self.chunk_size):
+            chunk = content[start:start + self.chunk_size]
+            response = self._request(result, session, 'PUT', url, size=len(chunk),
+                                     data={'filename': filename},
+                                     files={'file': (filename, chunk)},
+                                     headers={'Content-Range': "bytes {start}-{end}/{total}".format(
+                                         start=start,
+                                         end=start + len(chunk) - 1,
+                                         total=len(content))})
+            if response is None:
+                return False
+            url = self.base_url + '/exams/upload/' + response.json()['id']
+        return self._complete(result, session, url, content)
+
+    def upload_parallel(self, result, session, content, filename):
+        response = self._request(result, session, 'POST', self.base_url + '/exams/upload/parallel',
+                                 data={'filename': filename, 'size': len(content), 'chunk_size': self.chunk_size})
+        if response is None:
+            return False
+        url = self.base_url + '/exams/upload/parallel/' + response.json()['id']
+
+        def put_chunk(index):
+            chunk = content[index * self.chunk_size:(index + 1) * self.chunk_size]
+            # sessions are not thread safe, one per chunk sender
+            with requests.Session() as chunk_session:
+                return self._request(result, chunk_session, 'PUT', "{url}/chunks/{index}".format(url=url, index=index),
+                                     size=len(chunk),
+                                     data={'md5': hashlib.md5(chunk).hexdigest()},
+                                     files={'file': (filename, chunk)}) is not None
+
+        chunks_count = (len(content) + self.chunk_size - 1) // self.chunk_size
+        with ThreadPoolExecutor(max_workers=self.chunks_per_upload) as executor:
+            if not all(executor.map(put_chunk, range(chunks_count))):
+                return False
+        return self._complete(result, session, url, content)
+
+    def build_clips(self, folder, count):
+        clip_files = []
+        for _ in range(count):
+            self.clips_built += 1
+            clip_file = os.path.join(folder, "load_test_{index:06d}.mkv".format(index=self.clips_built))
+            build_test_clip(clip_file, self.width, self.height, self.seconds, horizontal_speed=self.clips_built)
+            clip_files.append(clip_file)
+        return clip_files
+
+    def simulate_device(self, result, clip_files):
+        with requests.Session() as session:
+            for clip_file in clip_files:
+                with open(clip_file, 'rb') as clip:
+                    content = clip.read()
+                filename = os.path.basename(clip_file)
+                if self.parallel:
+                    ok = self.upload_parallel(result, session, content, filename)
+                else:
+                    ok = self.upload_sequential(result, session, content, filename)
+                result.add_upload(ok)
+
+    def run(self, devices, uploads_per_device=1):
+        """
+        devices upload at the same time, returns an UploadLoadTestResult
+        the clips are built before starting, so encoding them is not measured
+        """
+        clips_folder = tempfile.mkdtemp(prefix='load_test_')
+        try:
+            clip_files = self.build_clips(clips_folder, devices * uploads_per_device)
+            result = UploadLoadTestResult(devices)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=devices) as executor:
+                for future in [executor.submit(self.simulate_device, result,
+                                               clip_files[device_index::devices])
+                               for device_index in range(devices)]:
+                    future.result()
+            result.wall_time = time.perf_counter() - start
+        finally:
+            shutil.rmtree(clips_folder, ignore_errors=True)
+        return result
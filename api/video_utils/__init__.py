@@ -1,2 +1,7 @@
-from .transcoding_gs import MKV2WEBMTranscoder, MKV2MP4Transcoder, MKV2OGGTranscoder
-from .methods import get_video_len
\ No newline at end of file
+from .transcoding_gs import MKV2WEBMTranscoder, MKV2MP4Transcoder, MKV2OGGTranscoder, MKV2MultiTranscoder, init_gstreamer, \
+    SegmentsJoinTranscoder, MP42MultiTranscoder, ProgressiveMKV2MultiTranscoder
+from .probe import MediaProbe, MediaInfo
+from .streaming_upload import StorageStreamUploader, BlockingStream
+from .hls import write_hls_master_playlist
+from .thumbnails import get_thumbnail_files, build_poster, build_sprite_sheet
+from .encoder_presets import ENCODER_PRESETS, get_encoder_properties
\ No newline at end of file
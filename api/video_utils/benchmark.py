@@ -0,0 +1,84 @@
+import json
+import os
+from .transcoding_gs import AbstractTranscoder, MKV2MultiTranscoder
+
+# MJPEG in matroska, same as the recordings uploaded by the devices
+TEST_CLIP_DEF = "videotestsrc num-buffers={frames} pattern={pattern} horizontal-speed={horizontal_speed} ! " \
+                "video/x-raw,width={width},height={height},framerate={framerate}/1 ! " \
+                "jpegenc ! matroskamux ! filesink location={output_file}"
+
+
+def build_test_clip(output_file, width, height, seconds, framerate=30, pattern='smpte', horizontal_speed=0):
+    """
+    writes a synthetic clip, returns its frames count
+    horizontal_speed moves the pattern, clips with different speeds have different content
+    """
+    frames = seconds * framerate
+    clip = AbstractTranscoder(None, output_file)
+    clip.set_pipeline_def(TEST_CLIP_DEF, frames=frames, pattern=pattern, horizontal_speed=horizontal_speed,
+                          width=width, height=height, framerate=framerate)
+    clip.apply()
+    if clip.error is not None:
+        raise Exception("build_test_clip - error building {output_file}: {error}".format(output_file=output_file,
+                                                                                       error=clip.error))
+    return frames
+
+
+def get_transcoder_classes(base_class=AbstractTranscoder):
+    classes = []
+    for subclass in base_class.__subclasses__():
+        if subclass.MKV_SOURCE:
+            classes.append(subclass)
+        classes.extend(get_transcoder_classes(subclass))
+    return classes
+
+
+def create_transcoder(transcoder_class, input_file, output_folder, preset=None):
+    output_name = os.path.join(output_folder, transcoder_class.__name__.lower())
+    if issubclass(transcoder_class, MKV2MultiTranscoder):
+        return transcoder_class(input_file, output_files=dict(
+            (rendition, output_name + '.' + rendition) for rendition in ('ogg', 'webm', 'mp4')), preset=preset)
+    return transcoder_class(input_file, output_name, preset=preset)
+
+
+def run_benchmark(transcoder_class, input_file, output_folder, frames, seconds, preset=None):
+    """
+    fps = source frames / wall time, rtf ( real time factor ) = wall time / source duration
+    """
+    transcoder = create_transcoder(transcoder_class, input_file, output_folder, preset)
+    transcoder.apply()
+    wall_time = transcoder.stats['wall_time']
+    return {
+        'fps': frames / wall_time if wall_time > 0 else 0.0,
+        'rtf': wall_time / seconds,
+        'output_bytes': transcoder.stats['output_bytes'],
+        'error': transcoder.error,
+    }
+
+
+def get_benchmark_key(transcoder_class, preset, width, height, seconds):
+    return "{name} {preset} {width}x{height} {seconds}s".format(name=transcoder_class.__name__, preset=preset,
+                                                               width=width, height=height, seconds=seconds)
+
+
+def load_baseline(baseline_file):
+    if not os.path.exists(baseline_file):
+        return {}
+    with open(baseline_file) as file:
+        return json.load(file)
+
+
+def save_baseline(baseline_file, results):
+    with open(baseline_file, 'w') as file:
+        json.dump(dict((key, result['fps']) for key, result in results.items()), file, indent=2, sort_keys=True)
+
+
+def get_regressions(baseline, results, tolerance):
+    """
+    benchmarks whose fps dropped more than tolerance ( 0..1 ) below the baseline one
+    """
+    regressions = []
+    for key, result in sorted(results.items()):
+        if key in baseline and result['fps'] < baseline[key] * (1 - tolerance):
+            regressions.append((key, baseline[key], result['fps']))
+    return regressions
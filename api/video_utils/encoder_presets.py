@@ -0,0 +1,39 @@
+# named encoder profiles, element -> properties, trading speed for quality
+# 'default' matches the historical hard-coded pipelines
+ENCODER_PRESETS = {
+    'quality': {
+        'theoraenc': {'bitrate': 8000, 'quality': 63, 'speed-level': 0},
+        'vp8enc': {'threads': 4, 'deadline': 0, 'cpu-used': 0},
+        'x264enc': {'speed-preset': 'slow', 'threads': 0},
+    },
+    'default': {
+        'theoraenc': {'bitrate': 8000, 'quality': 63},
+        'vp8enc': {'threads': 4},
+        'x264enc': {},
+    },
+    'fast': {
+        'theoraenc': {'bitrate': 6000, 'quality': 48, 'speed-level': 2},
+        'vp8enc': {'threads': 4, 'deadline': 1, 'cpu-used': 8},
+        'x264enc': {'speed-preset': 'veryfast', 'threads': 0},
+    },
+    'fastest': {
+        'theoraenc': {'bitrate': 4000, 'quality': 32, 'speed-level': 2},
+        'vp8enc': {'threads': 4, 'deadline': 1, 'cpu-used': 16},
+        'x264enc': {'speed-preset': 'ultrafast', 'tune': 'zerolatency', 'threads': 0},
+    },
+}
+
+DEFAULT_ENCODER_PRESET = 'default'
+
+
+def get_encoder_properties(preset=None):
+    """
+    element -> gst-launch properties string for the given preset name
+    ex: {'x264enc': 'speed-preset=veryfast threads=0', ...}
+    """
+    preset = preset or DEFAULT_ENCODER_PRESET
+    if preset not in ENCODER_PRESETS:
+        raise ValueError("get_encoder_properties - unknown encoder preset {preset}".format(preset=preset))
+    return dict((element, " ".join("{name}={value}".format(name=name, value=value)
+                                   for name, value in sorted(properties.items())))
+                for element, properties in ENCODER_PRESETS[preset].items())
@@ -0,0 +1,47 @@
+import os
+
+
+def get_hls_playlist_bandwidth(playlist_file):
+    """
+    returns ( peak, average ) bits per second of a media playlist, measured from its
+    segments sizes and durations ( BANDWIDTH/AVERAGE-BANDWIDTH of the master playlist )
+    """
+    folder = os.path.dirname(playlist_file)
+    peak = 0
+    total_bits = 0
+    total_duration = 0.0
+    duration = None
+    with open(playlist_file, "r") as playlist:
+        for line in playlist:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                duration = float(line[len("#EXTINF:"):].split(",")[0])
+                continue
+            if not line or line.startswith("#") or duration is None:
+                continue
+            bits = os.path.getsize(os.path.join(folder, line)) * 8
+            if duration > 0:
+                peak = max(peak, int(bits / duration))
+            total_bits += bits
+            total_duration += duration
+            duration = None
+    average = int(total_bits / total_duration) if total_duration > 0 else peak
+    return peak, average
+
+
+def write_hls_master_playlist(master_file, variants):
+    """
+    variants is a list of ( media playlist file, width, height ) on the same folder tree
+    than the master playlist, uris are written relative to it
+    """
+    folder = os.path.dirname(master_file)
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for playlist_file, width, height in variants:
+        peak, average = get_hls_playlist_bandwidth(playlist_file)
+        attributes = "BANDWIDTH={peak},AVERAGE-BANDWIDTH={average}".format(peak=max(peak, 1), average=max(average, 1))
+        if width and height:
+            attributes += ",RESOLUTION={width}x{height}".format(width=width, height=height)
+        lines.append("#EXT-X-STREAM-INF:" + attributes)
+        lines.append(os.path.relpath(playlist_file, folder).replace(os.sep, "/"))
+    with open(master_file, "w") as master:
+        master.write("\n".join(lines) + "\n")
@@ -0,0 +1,66 @@
+import gi
+gi.require_version('Gst', '1.0')
+gi.require_version('GstPbutils', '1.0')
+from gi.repository import Gst, GstPbutils
+from collections import namedtuple
+import logging
+import threading
+from .transcoding_gs import init_gstreamer
+
+# duration in seconds, codec is the video caps name ( ex: image/jpeg, video/x-h264 ), framerate in fps
+MediaInfo = namedtuple('MediaInfo', ['duration', 'codec', 'width', 'height', 'framerate'])
+
+
+class MediaProbe:
+    """
+    in process GstPbutils.Discoverer, only the headers ( and the index for matroska ) are read
+    results are kept on a cache ( django cache api: get/set ) by key, the upload id or its content hash
+    """
+
+    CACHE_KEY = "media_probe:{key}"
+
+    def __init__(self, cache=None, timeout=10, cache_timeout=None):
+        self.cache = cache
+        self.timeout = timeout
+        self.cache_timeout = cache_timeout
+        self.discoverer = None
+        # a discoverer runs a single discovery at a time
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger('transcoder')
+
+    def _get_discoverer(self):
+        if self.discoverer is None:
+            init_gstreamer()
+            self.discoverer = GstPbutils.Discoverer.new(self.timeout * Gst.SECOND)
+        return self.discoverer
+
+    def discover(self, file_name):
+        """
+        returns a MediaInfo, raises on files that can not be probed
+        """
+        with self.lock:
+            info = self._get_discoverer().discover_uri(Gst.filename_to_uri(file_name))
+        if info.get_result() != GstPbutils.DiscovererResult.OK:
+            raise Exception("MediaProbe - error probing {file_name}: {result}".format(file_name=file_name,
+                                                                                      result=info.get_result()))
+        video_streams = info.get_video_streams()
+        if not video_streams:
+            raise Exception("MediaProbe - {file_name} has no video stream".format(file_name=file_name))
+        video = video_streams[0]
+        framerate = video.get_framerate_num() / video.get_framerate_denom() if video.get_framerate_denom() else 0.0
+        return MediaInfo(duration=info.get_duration() / Gst.SECOND,
+                         codec=video.get_caps().get_structure(0).get_name(),
+                         width=video.get_width(),
+                         height=video.get_height(),
+                         framerate=framerate)
+
+    def probe(self, file_name, key=None):
+        if key is not None and self.cache is not None:
+            cached = self.cache.get(self.CACHE_KEY.format(key=key))
+            if cached is not None:
+                return MediaInfo(*cached)
+        media_info = self.discover(file_name)
+        self.logger.info("MediaProbe - {file_name} {media_info}".format(file_name=file_name, media_info=media_info))
+        if key is not None and self.cache is not None:
+            self.cache.set(self.CACHE_KEY.format(key=key), tuple(media_info), self.cache_timeout)
+        return media_info
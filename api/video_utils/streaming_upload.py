@@ -0,0 +1,96 @@
+import logging
+import threading
+
+
+class BlockingStream:
+    """
+    bounded in memory pipe between a writer ( gstreamer appsink ) and a reader ( uploader )
+    writes block while there are more than max_size bytes not read yet, reads block until
+    the requested amount of bytes is available or the writer closed the stream
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.buffer = bytearray()
+        self.position = 0
+        self.closed = False
+        self.error = None
+        self.condition = threading.Condition()
+
+    def write(self, data):
+        with self.condition:
+            while len(self.buffer) >= self.max_size and not self.closed:
+                self.condition.wait()
+            if self.closed:
+                raise IOError("BlockingStream - write on closed stream {error}".format(error=self.error))
+            self.buffer.extend(data)
+            self.condition.notify_all()
+
+    def read(self, size=-1):
+        with self.condition:
+            while not self.closed and (size < 0 or len(self.buffer) < size):
+                self.condition.wait()
+            if self.error is not None:
+                raise IOError("BlockingStream - aborted {error}".format(error=self.error))
+            if size < 0:
+                size = len(self.buffer)
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            self.position += len(data)
+            self.condition.notify_all()
+            return data
+
+    def tell(self):
+        return self.position
+
+    def close(self, error=None):
+        """
+        ends the stream, if error is set the reader fails instead of getting EOF
+        the first close wins, an already ended stream is left as it is
+        """
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.error = error
+            self.condition.notify_all()
+
+
+class StorageStreamUploader(threading.Thread):
+    """
+    uploads everything written to its stream to a GoogleCloudStorage backend using a
+    resumable upload, so the content never touches the local disk. memory is bounded by
+    the upload chunk size plus the stream buffer
+    """
+
+    def __init__(self, storage, name, content_type, chunk_size):
+        super().__init__(daemon=True)
+        self.storage = storage
+        self.name = name
+        self.content_type = content_type
+        self.chunk_size = chunk_size
+        self.stream = BlockingStream(chunk_size)
+        self.error = None
+        self.logger = logging.getLogger('transcoder')
+
+    @staticmethod
+    def is_supported(storage):
+        return hasattr(storage, 'bucket')
+
+    def run(self):
+        try:
+            blob = self.storage.bucket.blob(self.storage._normalize_name(self.name))
+            # resumable uploads are sent on chunks of this size ( multiple of 256KB )
+            blob.chunk_size = self.chunk_size
+            # unknown size, forces the resumable upload
+            blob.upload_from_file(self.stream, content_type=self.content_type)
+            self.logger.info("StorageStreamUploader - uploaded {name} {size} bytes".format(
+                name=self.name,
+                size=self.stream.tell()))
+        except Exception as exc:
+            self.error = str(exc)
+            self.logger.error("StorageStreamUploader - error uploading {name}: {error}".format(
+                name=self.name,
+                error=exc))
+            # unblocks the writer
+            self.stream.close(error=self.error)
@@ -0,0 +1,37 @@
+import glob
+import os
+from PIL import Image
+
+
+def get_thumbnail_files(thumbnails_folder):
+    return sorted(glob.glob(os.path.join(thumbnails_folder, 'thumb_*.jpg')))
+
+
+def build_poster(thumbnail_files, poster_file, position=0.1):
+    """
+    copies the thumbnail at position ( 0..1 of the video ) as poster, the very first
+    frames of a recording are usually black
+    """
+    if not thumbnail_files:
+        return False
+    thumbnail_file = thumbnail_files[min(int(len(thumbnail_files) * position), len(thumbnail_files) - 1)]
+    with Image.open(thumbnail_file) as thumbnail:
+        thumbnail.convert('RGB').save(poster_file, 'JPEG', quality=85)
+    return True
+
+
+def build_sprite_sheet(thumbnail_files, sprite_file, columns, tile_width, tile_height):
+    """
+    tiles the thumbnails left to right, top to bottom on a single jpeg
+    thumbnail n covers the interval [n * interval, ( n + 1 ) * interval) of the video
+    """
+    if not thumbnail_files:
+        return False
+    rows = (len(thumbnail_files) + columns - 1) // columns
+    sprite = Image.new('RGB', (tile_width * min(columns, len(thumbnail_files)), tile_height * rows))
+    for index, thumbnail_file in enumerate(thumbnail_files):
+        with Image.open(thumbnail_file) as thumbnail:
+            tile = thumbnail.convert('RGB').resize((tile_width, tile_height), Image.BILINEAR)
+            sprite.paste(tile, ((index % columns) * tile_width, (index // columns) * tile_height))
+    sprite.save(sprite_file, 'JPEG', quality=75)
+    return True
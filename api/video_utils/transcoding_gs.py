@@ -2,52 +2,212 @@ import gi
 gi.require_version('Gst', '1.0')
 from gi.repository import Gst, GObject, GLib
 import logging
+import os
+import threading
+import time
+from .encoder_presets import get_encoder_properties
+
+
+def init_gstreamer():
+    """
+    initializes GStreamer only once per process
+    """
+    if not Gst.is_initialized():
+        Gst.init(None)
 
 
 class AbstractTranscoder:
 
+    # the input is a device recording ( MJPEG or H.264 in matroska ), see benchmark
+    MKV_SOURCE = True
+    # seconds between watchdog checks while waiting for EOS or error
+    WATCHDOG_POLL_INTERVAL = 1
+
     def __init__(self, input_file, output_file):
         self.pipeline = None
         self.bus = None
         self.pipeline_def = None
         self.input_file = input_file
         self.output_file = output_file
+        # error message if the pipeline ended on error
+        self.error = None
+        # only the [start, stop) range of the input is transcoded ( seconds, None for the whole input )
+        self.start = None
+        self.stop = None
+        # watchdog, see set_watchdog ( None waits forever )
+        self.stall_timeout = None
+        self.max_wall_time = None
+        # run telemetry, see collect_stats
+        self.stats = {}
+        self.frames = {}
+        self.frames_lock = threading.Lock()
         self.logger = logging.getLogger('transcoder')
 
-    def set_pipeline_def(self, pipeline_def):
-        self.pipeline_def = pipeline_def.format(input_file = self.input_file, output_file= self.output_file)
+    def set_pipeline_def(self, pipeline_def, **kwargs):
+        self.pipeline_def = pipeline_def.format(input_file = self.input_file, output_file= self.output_file, **kwargs)
+
+    def set_range(self, start, stop=None):
+        self.start = start
+        self.stop = stop
+
+    def set_watchdog(self, stall_timeout, duration=None, budget_factor=None, min_budget=0):
+        """
+        the pipeline is aborted if neither its position nor its frame counters advance for stall_timeout
+        seconds, or if it runs longer than min_budget + budget_factor * duration seconds ( duration is the
+        probed one of the input, only the set_range part of it counts )
+        """
+        self.stall_timeout = stall_timeout
+        if duration and budget_factor:
+            start = self.start or 0
+            stop = self.stop if self.stop is not None else max(duration, start)
+            self.max_wall_time = min_budget + (stop - start) * budget_factor
+
+    def get_progress(self):
+        """
+        ( pipeline position in nanoseconds, -1 if unknown, frames counted by the probes )
+        """
+        ok, position = self.pipeline.query_position(Gst.Format.TIME)
+        with self.frames_lock:
+            frames = sum(self.frames.values())
+        return position if ok else -1, frames
+
+    def _wait(self, start_time):
+        """
+        waits for EOS or error, returns the message or None if the watchdog gave up on the pipeline
+        """
+        if self.stall_timeout is None and self.max_wall_time is None:
+            return self.bus.timed_pop_filtered(Gst.CLOCK_TIME_NONE, Gst.MessageType.ERROR | Gst.MessageType.EOS)
+
+        progress = None
+        progress_time = time.monotonic()
+        while True:
+            msg = self.bus.timed_pop_filtered(self.WATCHDOG_POLL_INTERVAL * Gst.SECOND,
+                                              Gst.MessageType.ERROR | Gst.MessageType.EOS)
+            if msg is not None:
+                return msg
+            now = time.monotonic()
+            current_progress = self.get_progress()
+            if current_progress != progress:
+                progress = current_progress
+                progress_time = now
+            if self.stall_timeout is not None and now - progress_time > self.stall_timeout:
+                self.error = "watchdog: no progress for {seconds} seconds at {position} seconds, {frames} frames".format(
+                    seconds=self.stall_timeout,
+                    position=max(progress[0], 0) / Gst.SECOND,
+                    frames=progress[1])
+                return None
+            if self.max_wall_time is not None and now - start_time > self.max_wall_time:
+                self.error = "watchdog: running for more than {seconds} seconds, at {position} seconds".format(
+                    seconds=int(self.max_wall_time),
+                    position=max(progress[0], 0) / Gst.SECOND)
+                return None
+
+    def _seek_range(self):
+        # a flushing seek on the prerolled pipeline, outputs timestamps start at 0 and EOS is sent at stop
+        self.pipeline.set_state(Gst.State.PAUSED)
+        self.pipeline.get_state(Gst.CLOCK_TIME_NONE if self.stall_timeout is None else self.stall_timeout * Gst.SECOND)
+        self.pipeline.seek(1.0, Gst.Format.TIME, Gst.SeekFlags.FLUSH | Gst.SeekFlags.ACCURATE,
+                           Gst.SeekType.SET, int((self.start or 0) * Gst.SECOND),
+                           Gst.SeekType.NONE if self.stop is None else Gst.SeekType.SET,
+                           -1 if self.stop is None else int(self.stop * Gst.SECOND))
+
+    def _count_frame(self, pad, info, element_name):
+        # runs on the streaming threads, one per queue
+        with self.frames_lock:
+            self.frames[element_name] = self.frames.get(element_name, 0) + 1
+        return Gst.PadProbeReturn.OK
+
+    def _add_frame_probes(self):
+        """
+        counts the buffers that reach every decoder and encoder, so fps can be computed per stage
+        """
+        iterator = self.pipeline.iterate_recurse()
+        while True:
+            result, element = iterator.next()
+            if result != Gst.IteratorResult.OK:
+                break
+            klass = element.get_factory().get_metadata('klass') if element.get_factory() else ''
+            if 'Decoder' not in klass and 'Encoder' not in klass:
+                continue
+            pad = element.get_static_pad('sink')
+            if pad is None:
+                continue
+            self.frames[element.get_name()] = 0
+            pad.add_probe(Gst.PadProbeType.BUFFER, self._count_frame, element.get_name())
+
+    def get_output_bytes(self):
+        if self.output_file is None or not os.path.exists(self.output_file):
+            return 0
+        return os.path.getsize(self.output_file)
+
+    def collect_stats(self, msg, wall_time):
+        """
+        wall time, fps per decoder/encoder ( frames / wall time ), input/output bytes and final bus message
+        """
+        self.stats = {
+            'wall_time': wall_time,
+            'frames': dict(self.frames),
+            'fps': dict((name, frames / wall_time if wall_time > 0 else 0.0) for name, frames in self.frames.items()),
+            'input_bytes': os.path.getsize(self.input_file) if self.input_file and os.path.exists(self.input_file) else 0,
+            'output_bytes': self.get_output_bytes(),
+            'final_message': self.error if self.error is not None else
+            "EOS from {element}".format(element=msg.src.name),
+        }
+        self.logger.info("AbstractTranscoder - stats {stats}".format(stats=self.stats))
+
+    def on_pipeline_created(self):
+        """
+        hook called once the pipeline is parsed, before it starts playing
+        """
+        pass
+
+    def on_pipeline_finished(self, msg):
+        """
+        hook called with the final bus message ( EOS or ERROR, None if the watchdog aborted the pipeline ),
+        before the pipeline is freed
+        """
+        pass
 
     def apply(self):
-        # initialize GStreamer
-        Gst.init(None)
+        # initialize GStreamer ( no op if the process already did it )
+        init_gstreamer()
 
         self.logger.info("AbstractTranscoder - starting pipeline={pipeline_def}".format(pipeline_def=self.pipeline_def))
         self.pipeline = Gst.parse_launch(self.pipeline_def)
+        self._add_frame_probes()
+        self.on_pipeline_created()
 
+        start_time = time.monotonic()
+        if self.start is not None or self.stop is not None:
+            self._seek_range()
         self.pipeline.set_state(Gst.State.PLAYING)
-        # wait until EOS or error
         self.bus = self.pipeline.get_bus()
 
-        # wait until EOS or error
-        msg = self.bus.timed_pop_filtered(
-            Gst.CLOCK_TIME_NONE,
-            Gst.MessageType.ERROR | Gst.MessageType.EOS
-        )
+        # wait until EOS or error ( or the watchdog gives up )
+        msg = self._wait(start_time)
 
-        if msg.type == Gst.MessageType.ERROR:
+        if msg is None:
+            self.logger.error("AbstractTranscoder - aborting pipeline {error}".format(error=self.error))
+        elif msg.type == Gst.MessageType.ERROR:
             self.logger.info("AbstractTranscoder - Transcoding fatal error")
             res = msg.parse_error()
             self.logger.info(msg.src.name)
             self.logger.info(res[1])
-        if msg.type == Gst.MessageType.EOS:
+            self.error = "{element}: {error}".format(element=msg.src.name, error=res[0].message)
+        elif msg.type == Gst.MessageType.EOS:
             self.logger.info("AbstractTranscoder - EOS Reached from element={element}".format(element=msg.src.name))
 
+        self.on_pipeline_finished(msg)
+        self.collect_stats(msg, time.monotonic() - start_time)
+
         # free resources
         self.logger.info("AbstractTranscoder - Execution ending ...")
-        self.logger.info("AbstractTranscoder - Setting pipeline to PAUSED ...\n")
-        res = self.pipeline.set_state(Gst.State.PAUSED)
-        self.logger.info("AbstractTranscoder - Setting pipeline to READY ...\n")
-        res = self.pipeline.set_state(Gst.State.READY)
+        if msg is not None:
+            self.logger.info("AbstractTranscoder - Setting pipeline to PAUSED ...\n")
+            res = self.pipeline.set_state(Gst.State.PAUSED)
+            self.logger.info("AbstractTranscoder - Setting pipeline to READY ...\n")
+            res = self.pipeline.set_state(Gst.State.READY)
+        # an aborted pipeline may not preroll again, it goes straight to NULL ( streaming threads are stopped )
         self.logger.info("AbstractTranscoder - Setting pipeline to NULL ...\n")
         res = self.pipeline.set_state(Gst.State.NULL)
         self.logger.info("AbstractTranscoder - Freeing pipeline ...\n")
@@ -58,20 +218,333 @@ class AbstractTranscoder:
 
 class MKV2OGGTranscoder(AbstractTranscoder):
 
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, preset=None):
         super().__init__(input_file, output_file)
-        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! videorate ! video/x-raw,framerate=10/1 ! theoraenc bitrate=8000  quality=63 ! oggmux ! filesink location={output_file}")
+        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! videorate ! video/x-raw,framerate=10/1 ! theoraenc {theoraenc} ! oggmux ! filesink location={output_file}",
+                              **get_encoder_properties(preset))
 
 
 class MKV2WEBMTranscoder(AbstractTranscoder):
 
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, preset=None):
         super().__init__(input_file, output_file)
-        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! vp8enc threads=4 ! webmmux ! filesink location={output_file}")
+        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! vp8enc {vp8enc} ! webmmux ! filesink location={output_file}",
+                              **get_encoder_properties(preset))
 
 
 class MKV2MP4Transcoder(AbstractTranscoder):
 
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, preset=None):
         super().__init__(input_file, output_file)
-        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! x264enc ! qtmux ! filesink location={output_file}")
\ No newline at end of file
+        self.set_pipeline_def("filesrc location={input_file} ! matroskademux ! jpegdec ! videoconvert ! x264enc {x264enc} ! qtmux ! filesink location={output_file}",
+                              **get_encoder_properties(preset))
+
+
+class MKV2MultiTranscoder(AbstractTranscoder):
+    """
+    demuxes and decodes the MJPEG source only once and tees the raw frames to
+    one encoder branch per requested rendition, instead of running
+    MKV2OGGTranscoder, MKV2WEBMTranscoder and MKV2MP4Transcoder one after another
+    output_files is a dict rendition -> output file name ( ex: {'ogg': '/tmp/1.ogg', 'mp4': '/tmp/1.mp4'} )
+    output_streams is a dict rendition -> writable stream ( write(bytes)/close(error) ), encoded
+    bytes are pushed there from an appsink instead of being written to disk
+    packaged renditions ( hls/dash ) share the x264 encoding with the mp4 one, their output
+    file is the playlist/manifest and segments are written on the same folder
+    h264 sources are only remuxed to the source resolution mp4/hls/dash renditions, they are
+    decoded just if some other rendition ( ogg, webm, ladder variants, thumbnails ) needs raw frames
+    """
+
+    SOURCE_DEF = "filesrc location={input_file} ! matroskademux ! {decoder} ! videoconvert ! tee name=t"
+
+    # h264 is parsed once and tee'd to the remuxed outputs and to the decoder
+    REMUX_SOURCE_DEF = "filesrc location={input_file} ! matroskademux ! h264parse ! tee name=s"
+    REMUX_DECODER_DEF = "s. ! queue ! {decoder} ! videoconvert ! tee name=t"
+
+    # source caps name -> decoder, anything else goes through decodebin
+    DECODERS_DEF = {
+        'image/jpeg': "jpegdec",
+        'video/x-h264': "avdec_h264",
+    }
+
+    REMUXABLE_CODECS = ('video/x-h264',)
+
+    # each branch gets its own queue so that encoders run on their own streaming thread
+    # encoder properties come from the encoder preset ( see encoder_presets )
+    ENCODERS_DEF = {
+        'ogg': "videorate ! video/x-raw,framerate=10/1 ! theoraenc {theoraenc}",
+        'webm': "vp8enc {vp8enc}",
+        'mp4': "x264enc {x264enc}",
+    }
+
+    MUXERS_DEF = {
+        'ogg': "oggmux",
+        'webm': "webmmux",
+        'mp4': "qtmux",
+    }
+
+    # muxers that never seek back on its output, needed when there is no file behind
+    # ogg and fragmented mp4 stay seekable, webm ends up without duration nor cues ( not seekable )
+    STREAMABLE_MUXERS_DEF = {
+        'ogg': "oggmux",
+        'webm': "webmmux streamable=true",
+        'mp4': "qtmux streamable=true fragment-duration=1000",
+    }
+
+    # segments can only be cut on keyframes, so force them often enough for the target duration
+    H264_SEGMENTED_ENCODER_DEF = "x264enc key-int-max=60 {x264enc}"
+
+    # ladder variants are scaled ( letterboxed if the aspect ratio differs ) and encoded at a fixed bitrate ( kbps )
+    VARIANT_ENCODER_DEF = "videoscale add-borders=true ! video/x-raw,width={width},height={height},pixel-aspect-ratio=1/1 ! " \
+                          "x264enc bitrate={bitrate} key-int-max=60 {x264enc}"
+
+    SEGMENT_TARGET_DURATION = 6
+
+    PACKAGERS_DEF = {
+        'hls': "h264parse ! hlssink2 location={{output_dirs[{output}]}}/segment%05d.ts playlist-location={{output_files[{output}]}} "
+               "target-duration={target_duration} max-files=0 playlist-length=0",
+        'dash': "h264parse ! dashsink mpd-root-path={{output_dirs[{output}]}} mpd-filename={{output_names[{output}]}} "
+                "target-duration={target_duration}",
+    }
+
+    # a scaled jpeg every interval seconds, output file is a multifilesink pattern ( ex: /tmp/1/thumb_%05d.jpg )
+    THUMBNAILS_DEF = "t. ! queue leaky=downstream ! videorate drop-only=true ! video/x-raw,framerate=1/{interval} ! " \
+                     "videoscale add-borders=true ! video/x-raw,width={width},height={height},pixel-aspect-ratio=1/1 ! " \
+                     "jpegenc name=thumbnails ! multifilesink location={{output_files[thumbnails]}}"
+
+    FILE_SINK_DEF = "filesink location={{output_files[{output}]}}"
+
+    APP_SINK_DEF = "appsink name=appsink_{output} emit-signals=true sync=false"
+
+    def __init__(self, input_file, output_files=None, output_streams=None, variants=None, thumbnails=None,
+                 preset=None, codec='image/jpeg', remux=True, segmentable=False):
+        """
+        variants is the bitrate ladder, a list of dicts with name, width, height and bitrate ( kbps ),
+        each one is an extra h264 encoding whose outputs are keyed as rendition_name ( ex: mp4_720p, hls_720p )
+        thumbnails is a dict with interval ( seconds ), width and height used when output_files has 'thumbnails'
+        preset is the encoder preset name, default one if not set
+        codec is the source caps name ( see MediaProbe ), remux allows the h264 fast path
+        segmentable forces frequent keyframes on the h264 outputs, so they can be packaged later on
+        """
+        super().__init__(input_file, None)
+        self.output_files = output_files or {}
+        self.output_streams = output_streams or {}
+        self.variants = variants or []
+        self.thumbnails = thumbnails or {'interval': 10, 'width': 640, 'height': 360}
+        self.preset = preset
+        self.codec = codec
+        self.remux = remux and codec in self.REMUXABLE_CODECS
+        self.segmentable = segmentable
+        encoder_properties = get_encoder_properties(preset)
+        branches = []
+        for rendition in ('ogg', 'webm'):
+            output = self._get_output_def(rendition, rendition)
+            if output is not None:
+                branches.append("t. ! queue ! {encoder} ! {output}".format(
+                    encoder=self.ENCODERS_DEF[rendition].format(**encoder_properties),
+                    output=output))
+
+        # source resolution
+        if self.remux:
+            self._add_h264_branches(branches, '', None, None)
+        else:
+            self._add_h264_branches(branches, '', self.ENCODERS_DEF['mp4'].format(**encoder_properties) if not segmentable
+                                    else self.H264_SEGMENTED_ENCODER_DEF.format(**encoder_properties),
+                                    self.H264_SEGMENTED_ENCODER_DEF.format(**encoder_properties))
+        for variant in self.variants:
+            encoder = self.VARIANT_ENCODER_DEF.format(**variant, **encoder_properties)
+            self._add_h264_branches(branches, '_' + variant['name'], encoder, encoder)
+
+        # thumbnails come from the same decoded frames, the queue is leaky so they never stall the encoders
+        if 'thumbnails' in self.output_files:
+            branches.append(self.THUMBNAILS_DEF.format(**self.thumbnails))
+
+        if not branches:
+            raise ValueError("MKV2MultiTranscoder - at least one output is required")
+        if not self.remux:
+            sources = [self.SOURCE_DEF]
+        elif any(branch.startswith('t.') for branch in branches):
+            sources = [self.REMUX_SOURCE_DEF, self.REMUX_DECODER_DEF]
+        else:
+            # remux only, nothing is decoded nor encoded
+            sources = [self.REMUX_SOURCE_DEF]
+        self.set_pipeline_def(" ".join(sources + branches),
+                              decoder=self.DECODERS_DEF.get(codec, "decodebin"),
+                              output_files=self.output_files,
+                              output_dirs=dict((output, os.path.dirname(output_file))
+                                               for output, output_file in self.output_files.items()),
+                              output_names=dict((output, os.path.basename(output_file))
+                                                for output, output_file in self.output_files.items()))
+
+    def _add_h264_branches(self, branches, suffix, encoder, segmented_encoder):
+        """
+        encoder/segmented_encoder None means that the source is already h264, so it is only remuxed
+        """
+        mp4_output = self._get_output_def('mp4' + suffix, 'mp4')
+        packagers = [self.PACKAGERS_DEF[packager].format(output=packager + suffix,
+                                                         target_duration=self.SEGMENT_TARGET_DURATION)
+                     for packager in self.PACKAGERS_DEF if packager + suffix in self.output_files]
+        if encoder is None:
+            # segments are cut on the source keyframes
+            h264_outputs = packagers if mp4_output is None else [mp4_output] + packagers
+            for output in h264_outputs:
+                branches.append("s. ! queue ! {output}".format(output=output))
+        elif packagers:
+            # h264 is encoded once and tee'd to the mp4 muxer and the packagers
+            h264_outputs = packagers if mp4_output is None else ["h264parse ! " + mp4_output] + packagers
+            branches.append("t. ! queue ! {encoder} ! tee name=h264t{suffix}".format(encoder=segmented_encoder,
+                                                                                     suffix=suffix))
+            for output in h264_outputs:
+                branches.append("h264t{suffix}. ! queue ! {output}".format(suffix=suffix, output=output))
+        elif mp4_output is not None:
+            branches.append("t. ! queue ! {encoder} ! {output}".format(encoder=encoder, output=mp4_output))
+
+    def _get_output_def(self, output, rendition):
+        if output in self.output_files:
+            return "{muxer} ! {sink}".format(muxer=self.MUXERS_DEF[rendition],
+                                             sink=self.FILE_SINK_DEF.format(output=output))
+        if output in self.output_streams:
+            return "{muxer} ! {sink}".format(muxer=self.STREAMABLE_MUXERS_DEF[rendition],
+                                             sink=self.APP_SINK_DEF.format(output=output))
+        return None
+
+    @staticmethod
+    def _on_new_sample(appsink, stream):
+        sample = appsink.emit('pull-sample')
+        buffer = sample.get_buffer()
+        try:
+            # blocks while the stream is full, that throttles the whole pipeline
+            stream.write(buffer.extract_dup(0, buffer.get_size()))
+        except Exception:
+            return Gst.FlowReturn.ERROR
+        return Gst.FlowReturn.OK
+
+    def on_pipeline_created(self):
+        for output, stream in self.output_streams.items():
+            appsink = self.pipeline.get_by_name("appsink_{output}".format(output=output))
+            appsink.connect('new-sample', self._on_new_sample, stream)
+
+    def on_pipeline_finished(self, msg):
+        for stream in self.output_streams.values():
+            stream.close(error=self.error)
+
+    def get_output_bytes(self):
+        # packaged outputs and thumbnails are folders, variant playlists live under the main hls one
+        output_files = set()
+        for output, output_file in self.output_files.items():
+            if output.split('_')[0] in self.PACKAGERS_DEF or output == 'thumbnails':
+                for folder, _folders, names in os.walk(os.path.dirname(output_file)):
+                    output_files.update(os.path.join(folder, name) for name in names)
+            elif os.path.exists(output_file):
+                output_files.add(output_file)
+        return sum(os.path.getsize(output_file) for output_file in output_files) + \
+            sum(stream.tell() for stream in self.output_streams.values())
+
+
+class ProgressiveMKV2MultiTranscoder(MKV2MultiTranscoder):
+    """
+    MKV2MultiTranscoder whose source is a file still being written ( a chunked upload ), an appsrc is fed
+    from it and waits at its end for more data while is_growing() is True ( by default while the file
+    exists, chunked uploads are renamed once completed ), then the rest of the file is pushed and the
+    stream ends. matroska is demuxed on push mode, so nothing is seeked
+    """
+
+    # not benchmarked, a finished clip would be waited on forever
+    MKV_SOURCE = False
+
+    APP_SOURCE_DEF = "appsrc name=progressive_source format=bytes stream-type=stream block=true max-bytes=4194304"
+    SOURCE_DEF = APP_SOURCE_DEF + " ! matroskademux ! {decoder} ! videoconvert ! tee name=t"
+    REMUX_SOURCE_DEF = APP_SOURCE_DEF + " ! matroskademux ! h264parse ! tee name=s"
+
+    READ_SIZE = 1024 * 1024
+
+    def __init__(self, input_file, output_files=None, output_streams=None, variants=None, thumbnails=None,
+                 preset=None, codec='image/jpeg', remux=True, is_growing=None, poll_interval=1):
+        super().__init__(input_file, output_files, output_streams=output_streams, variants=variants,
+                         thumbnails=thumbnails, preset=preset, codec=codec, remux=remux)
+        self.is_growing = is_growing or (lambda: os.path.exists(input_file))
+        self.poll_interval = poll_interval
+        self.bytes_read = 0
+        self.stop_feeding = threading.Event()
+
+    def _feed(self, appsrc):
+        with open(self.input_file, 'rb') as source:
+            while not self.stop_feeding.is_set():
+                # checked before reading, so everything written before the file stopped growing is read
+                growing = self.is_growing()
+                data = source.read(self.READ_SIZE)
+                if data:
+                    self.bytes_read += len(data)
+                    if appsrc.emit('push-buffer', Gst.Buffer.new_wrapped(data)) != Gst.FlowReturn.OK:
+                        # pipeline error or flushing
+                        return
+                    continue
+                if not growing:
+                    appsrc.emit('end-of-stream')
+                    return
+                self.stop_feeding.wait(self.poll_interval)
+
+    def get_progress(self):
+        # waiting for new chunks is progress as long as they keep arriving
+        return super().get_progress() + (self.bytes_read,)
+
+    def on_pipeline_created(self):
+        super().on_pipeline_created()
+        feeder = threading.Thread(target=self._feed, args=(self.pipeline.get_by_name('progressive_source'),),
+                                  daemon=True)
+        feeder.start()
+
+    def on_pipeline_finished(self, msg):
+        # a feeder blocked on push-buffer is released once the pipeline goes to NULL
+        self.stop_feeding.set()
+        super().on_pipeline_finished(msg)
+
+
+class SegmentsJoinTranscoder(MKV2MultiTranscoder):
+    """
+    joins the segments of a rendition encoded in parallel ( see MKV2MultiTranscoder.set_range ) without
+    encoding them again, splitmuxsrc plays the files matching input_pattern sorted by name as a single
+    stream. joined h264 ( rendition mp4 ) is also packaged to the hls/dash outputs if they are requested
+    """
+
+    MKV_SOURCE = False
+
+    JOIN_SOURCES_DEF = {
+        'webm': "splitmuxsrc location={input_file} ! tee name=s",
+        'mp4': "splitmuxsrc location={input_file} ! h264parse ! tee name=s",
+    }
+
+    def __init__(self, input_pattern, rendition, output_files=None, output_streams=None):
+        AbstractTranscoder.__init__(self, input_pattern, None)
+        self.output_files = output_files or {}
+        self.output_streams = output_streams or {}
+        self.variants = []
+        self.remux = True
+        branches = []
+        if rendition == 'mp4':
+            self._add_h264_branches(branches, '', None, None)
+        else:
+            output = self._get_output_def(rendition, rendition)
+            if output is not None:
+                branches.append("s. ! queue ! {output}".format(output=output))
+        if not branches:
+            raise ValueError("SegmentsJoinTranscoder - at least one output is required")
+        self.set_pipeline_def(" ".join([self.JOIN_SOURCES_DEF[rendition]] + branches),
+                              output_files=self.output_files,
+                              output_dirs=dict((output, os.path.dirname(output_file))
+                                               for output, output_file in self.output_files.items()),
+                              output_names=dict((output, os.path.basename(output_file))
+                                                for output, output_file in self.output_files.items()))
+
+
+class MP42MultiTranscoder(MKV2MultiTranscoder):
+    """
+    same as MKV2MultiTranscoder but from an already transcoded h264 mp4 rendition, used to
+    generate lazy renditions once the device recording is gone
+    """
+
+    MKV_SOURCE = False
+
+    SOURCE_DEF = "filesrc location={input_file} ! qtdemux ! h264parse ! {decoder} ! videoconvert ! tee name=t"
+
+    def __init__(self, input_file, output_files=None, output_streams=None, preset=None):
+        super().__init__(input_file, output_files, output_streams, preset=preset, codec='video/x-h264', remux=False)
@@ -17,6 +17,12 @@ from .device_user_groups import DeviceUsersGroupsListCreateView, DeviceUsersGrou
 
 from .news import NewsListCreateAPIView, NewsRetrieveUpdateDestroyAPIView
 
-from .file_uploads import FileUploadView
+from .file_uploads import FileUploadView, ParallelFileUploadView
 
 from .videos import VideosListAPIView, VideosUsersAPIView, VideoPlayAPIView
+
+
+from .transcoding_metrics import TranscodingMetricsListAPIView, TranscodingMetricsReportView
+
+from .exam_pending_requests import ExamPendingRequestListAPIView, ExamPendingRequestRetrieveAPIView, \
+    ExamPendingRequestPriorityAPIView
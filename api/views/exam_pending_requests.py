@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import ListAPIView, RetrieveAPIView, UpdateAPIView
+from ..decorators import role_required
+from ..models import User, ExamPendingRequest, TranscodingMetric
+from ..serializers import ExamPendingRequestReadSerializer, ExamPendingRequestPrioritySerializer
+
+
+class ExamPendingRequestQueueMixin:
+
+    def get_queryset(self):
+        current_user = self.request.user
+        queryset = ExamPendingRequest.objects.select_related('exercise', 'device')
+        if current_user.is_student:
+            return queryset.filter(taker=current_user)
+        if current_user.is_teacher:
+            return queryset.filter(Q(device__in=current_user.my_devices_ids))
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['queue_positions'] = ExamPendingRequest.objects.queue_positions(
+            settings.TRANSCODING_CLAIM_TIMEOUT,
+            TranscodingMetric.get_seconds_per_second()
+        )
+        return context
+
+
+class ExamPendingRequestListAPIView(ExamPendingRequestQueueMixin, ListAPIView):
+    serializer_class = ExamPendingRequestReadSerializer
+
+    filter_backends = (OrderingFilter,)
+    ordering_fields = ('id', 'created', 'priority', 'status')
+    ordering = ('-created',)
+
+    @role_required(required_role=User.STUDENT)
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class ExamPendingRequestRetrieveAPIView(ExamPendingRequestQueueMixin, RetrieveAPIView):
+    serializer_class = ExamPendingRequestReadSerializer
+
+    @role_required(required_role=User.STUDENT)
+    def get(self, request, *args, **kwargs):
+        return self.retrieve(request, *args, **kwargs)
+
+
+class ExamPendingRequestPriorityAPIView(ExamPendingRequestQueueMixin, UpdateAPIView):
+    serializer_class = ExamPendingRequestPrioritySerializer
+
+    @role_required(required_role=User.TEACHER)
+    def put(self, request, *args, **kwargs):
+        return self.update(request, *args, **kwargs)
@@ -1,12 +1,19 @@
-from drf_chunked_upload.views import ChunkedUploadView
+from drf_chunked_upload.exceptions import ChunkedUploadError
+from drf_chunked_upload.views import ChunkedUploadView, is_authenticated
+from rest_framework import status
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from ..serializers import FileUploadSerializer
 from ..models import FileUpload
+import hashlib
 import logging
 from ..models import ModelValidationException, Device, ExamPendingRequestVideo
 from ..serializers import ExamPendingRequestWriteSerializer
-from ..exceptions import CustomValidationError
+from ..exceptions import CustomValidationError, ServiceUnavailableError
+from ..utils.disk_space import DiskSpaceMonitor
+from django.conf import settings
 from django.db import transaction
+from django.shortcuts import get_object_or_404
 from django.utils.translation import ugettext_lazy as _
 
 
@@ -19,6 +26,48 @@ class FileUploadView(ChunkedUploadView):
 
     serializer_class = FileUploadSerializer
 
+    def get_queryset(self):
+        return super().get_queryset().filter(chunk_size=0)
+
+    def get_disk_space_monitor(self):
+        return DiskSpaceMonitor(settings.DISK_SPACE_PATH,
+                                settings.DISK_SPACE_MIN_FREE,
+                                settings.TRANSCODING_DISK_FOOTPRINT_FACTOR,
+                                settings.TRANSCODING_CLAIM_TIMEOUT)
+
+    def _put_chunk(self, request, pk=None, whole=False, *args, **kwargs):
+        # admission control, the rest of the upload must fit on disk or it is not started / continued
+        total = None
+        start = 0
+        if whole:
+            chunk = request.data.get(self.field_name)
+            total = chunk.size if chunk is not None else None
+        else:
+            match = self.content_range_pattern.match(request.META.get('HTTP_CONTENT_RANGE', ''))
+            if match:
+                start = int(match.group('start'))
+                total = int(match.group('total'))
+
+        if total is not None:
+            self.check_disk_space(total - start, pk)
+
+        chunked_upload = super()._put_chunk(request, pk=pk, whole=whole, *args, **kwargs)
+        if pk is None:
+            # the first chunk is saved by the serializer, the next ones are hashed on append_chunk
+            chunked_upload.start_hashes(request.data[self.field_name])
+            chunked_upload.save(update_fields=['content_hash_state', 'md5_state'])
+        if total is not None and chunked_upload.expected_size != total:
+            chunked_upload.set_expected_size(total)
+        return chunked_upload
+
+    def check_disk_space(self, size, upload_id):
+        if not self.get_disk_space_monitor().can_upload(size, upload_id=upload_id):
+            logging.getLogger('api').warning("FileUploadView - not enough disk space for {size} bytes, upload {id}".format(
+                size=size,
+                id=upload_id))
+            raise ServiceUnavailableError(_("not enough disk space, try again later"),
+                                          wait=settings.DISK_SPACE_RETRY_AFTER)
+
     @transaction.atomic
     def on_completion(self, chunked_upload, request):
         logger = logging.getLogger('api')
@@ -46,6 +95,7 @@ class FileUploadView(ChunkedUploadView):
                 logger.info("uploading new exam request - saving video")
                 exam_video = ExamPendingRequestVideo()
                 exam_video.file_upload = chunked_upload
+                exam_video.content_hash = chunked_upload.content_hash
                 logger.info("uploading new exam request - saved video")
                 exam_video.set_request(exam)
                 exam_video.save()
@@ -57,3 +107,107 @@ class FileUploadView(ChunkedUploadView):
         except Exception as exc:
             logger.error("FileUploadView - Unexpected error", exc)
             raise exc
+
+
+class ParallelFileUploadView(FileUploadView):
+    """
+    chunks are sent concurrently and in any order: POST with filename, size and chunk_size creates the
+    upload, PUT .../chunks/<index> sends a chunk with its md5, GET returns the received ones ( so only the
+    missing or failed ones are sent again ) and POST with the whole file md5 assembles and completes it
+    """
+
+    def get_queryset(self):
+        return super(FileUploadView, self).get_queryset().filter(chunk_size__gt=0)
+
+    def get_file_upload(self, pk):
+        file_upload = get_object_or_404(self.get_queryset(), pk=pk)
+        self.is_valid_chunked_upload(file_upload)
+        return file_upload
+
+    def create_parallel_upload(self, request):
+        filename = request.data.get('filename')
+        try:
+            size = int(request.data.get('size'))
+            chunk_size = int(request.data.get('chunk_size'))
+        except (TypeError, ValueError):
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail="'filename', 'size' and 'chunk_size' are required")
+        if not filename or size <= 0 or chunk_size <= 0:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail="'filename', 'size' and 'chunk_size' are required")
+        max_bytes = self.get_max_bytes(request)
+        if max_bytes is not None and size > max_bytes:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail='Size of file exceeds the limit (%s bytes)' % max_bytes)
+        self.check_disk_space(size, None)
+
+        file_upload = self.create_chunked_upload(filename=filename,
+                                                 user=request.user if is_authenticated(request.user) else None,
+                                                 expected_size=size,
+                                                 chunk_size=chunk_size)
+        file_upload.save()
+        return Response(self.response_serializer_class(file_upload, context={'request': request}).data,
+                        status=status.HTTP_201_CREATED)
+
+    def _put(self, request, pk=None, index=None, *args, **kwargs):
+        file_upload = self.get_file_upload(pk)
+        if index is None or index >= file_upload.get_chunks_count():
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail='Chunk index out of range')
+        chunk = request.data.get(self.field_name)
+        if chunk is None:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail='No chunk file was submitted')
+        if chunk.size != file_upload.get_chunk_size(index):
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail="Chunk size doesn't match: chunk size is {} but {} expected".format(
+                                         chunk.size, file_upload.get_chunk_size(index)),
+                                     index=index)
+        md5 = hashlib.md5()
+        for data in chunk.chunks():
+            md5.update(data)
+        if md5.hexdigest() != request.data.get('md5'):
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail='md5 checksum does not match',
+                                     index=index)
+        self.check_disk_space(file_upload.expected_size - file_upload.offset, file_upload.id)
+
+        file_upload.save_chunk(index, chunk, md5.hexdigest())
+        return Response({'index': index, 'size': chunk.size, 'md5': md5.hexdigest()}, status=status.HTTP_200_OK)
+
+    def _post(self, request, pk=None, *args, **kwargs):
+        if pk is None:
+            return self.create_parallel_upload(request)
+
+        file_upload = self.get_file_upload(pk)
+        if not request.data.get('md5'):
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail="'md5' is required")
+        missing = file_upload.get_missing_chunks()
+        if missing:
+            raise ChunkedUploadError(status=status.HTTP_400_BAD_REQUEST,
+                                     detail='Missing chunks',
+                                     missing=missing)
+        # chunks and the assembled file are on disk at the same time for a while
+        self.check_disk_space(file_upload.expected_size, file_upload.id)
+
+        file_upload.assemble_chunks()
+        try:
+            self.md5_check(file_upload, request.data.get('md5'))
+        except ChunkedUploadError:
+            file_upload.discard_assembled()
+            raise
+        file_upload.completed()
+        file_upload.delete_chunks()
+
+        self.on_completion(file_upload, request)
+        return Response(self.response_serializer_class(file_upload, context={'request': request}).data,
+                        status=status.HTTP_200_OK)
+
+    def _get(self, request, pk=None, *args, **kwargs):
+        if pk is None:
+            return self.list(request, *args, **kwargs)
+        file_upload = get_object_or_404(self.get_queryset(), pk=pk)
+        data = dict(self.response_serializer_class(file_upload, context={'request': request}).data)
+        data['chunks'] = list(file_upload.chunks.order_by('index').values('index', 'size', 'md5'))
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,45 @@
+from django.db.models import Avg, Sum, Count
+from rest_framework.filters import OrderingFilter
+from rest_framework.generics import ListAPIView
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from ..decorators import role_required
+from ..models import User, TranscodingMetric
+from ..serializers import TranscodingMetricReadSerializer
+
+
+class TranscodingMetricsListAPIView(ListAPIView):
+    serializer_class = TranscodingMetricReadSerializer
+
+    filter_backends = (OrderingFilter,)
+    ordering_fields = ('id', 'created', 'wall_time', 'queue_wait', 'encode_fps')
+
+    def get_queryset(self):
+        queryset = TranscodingMetric.objects.order_by('-created')
+        pending_request_id = self.kwargs.get('pk')
+        if pending_request_id is not None:
+            queryset = queryset.filter(pending_request_id=pending_request_id)
+        return queryset
+
+    @role_required(required_role=User.SUPERVISOR)
+    def get(self, request, *args, **kwargs):
+        return self.list(request, *args, **kwargs)
+
+
+class TranscodingMetricsReportView(APIView):
+
+    @role_required(required_role=User.SUPERVISOR)
+    def get(self, request):
+        # per rendition set and encoder preset, to size the worker fleet
+        report = TranscodingMetric.objects.values('renditions', 'preset').annotate(
+            runs=Count('id'),
+            avg_queue_wait=Avg('queue_wait'),
+            avg_wall_time=Avg('wall_time'),
+            avg_speed=Avg('speed'),
+            avg_decode_fps=Avg('decode_fps'),
+            avg_encode_fps=Avg('encode_fps'),
+            input_bytes=Sum('input_bytes'),
+            output_bytes=Sum('output_bytes'),
+        ).order_by('renditions', 'preset')
+        failed = TranscodingMetric.objects.filter(succeeded=False).count()
+        return Response({'failed': failed, 'renditions': list(report)})
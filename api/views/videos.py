@@ -95,6 +95,20 @@ class VideoPlayAPIView(GenericAPIView):
 
             exam.add_view()
 
+            # ?type=video/webm plays that rendition, a lazy one is generated if it is not yet
+            video_type = request.query_params.get('type')
+            pending = False
+            for video in exam.videos.all():
+                if video_type is not None and video.type != video_type:
+                    continue
+                if video.is_ready():
+                    video.touch()
+                elif video.is_lazy and video_type is not None:
+                    video.request_generation()
+                    pending = True
+
+            if pending:
+                return Response(status=status.HTTP_202_ACCEPTED)
             return Response(status=status.HTTP_204_NO_CONTENT)
 
         except ModelValidationException as error1:
@@ -182,6 +182,8 @@ MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 CRON_CLASSES = [
     "api.cron_jobs.MailCronJob",
     "api.cron_jobs.ExamPendingRequestsJob",
+    "api.cron_jobs.LazyRenditionsEvictionJob",
+    "api.cron_jobs.UploadReaperJob",
 ]
 
 DJANGO_CRON_LOCK_BACKEND = 'django_cron.backends.lock.file.FileLock'
@@ -199,6 +201,100 @@ STREAMING_SERVER_DASH_TPL = STREAMING_SERVER + '/dash/{slug}.m4v'
 STREAMING_SERVER_HLS_TPL = STREAMING_SERVER + '/hls/{slug}.m3u8'
 FILE_UPLOAD_TEMP_DIR="/tmp/django_file_uploads"
 
+# how many exam pending requests are transcoded in parallel ( 1 = serial, on the cron process )
+EXAM_PENDING_REQUESTS_WORKERS = int(os.getenv("EXAM_PENDING_REQUESTS_WORKERS") or 1)
+# transcoding workers ( python manage.py run_transcoding_worker ), all values in seconds
+# a claim not refreshed by its worker heartbeat during TRANSCODING_CLAIM_TIMEOUT is considered dead
+TRANSCODING_CLAIM_TIMEOUT = int(os.getenv("TRANSCODING_CLAIM_TIMEOUT") or 600)
+TRANSCODING_HEARTBEAT_INTERVAL = 60
+TRANSCODING_POLL_INTERVAL = 5
+# attempts before a request is marked as failed
+TRANSCODING_MAX_ATTEMPTS = 3
+# encode all renditions on a single pass ( source decoded once ) or one pass per rendition
+# ( a checkpoint after each one, so a restarted worker only redoes the unfinished ones )
+TRANSCODING_SINGLE_PASS = (os.getenv("TRANSCODING_SINGLE_PASS") or "true").lower() == "true"
+# upload renditions to the video bucket while encoding ( resumable upload, nothing written to local disk )
+# webm is always written to disk, streamed it would have no duration nor cues and could not be seeked
+TRANSCODING_STREAM_UPLOAD = (os.getenv("TRANSCODING_STREAM_UPLOAD") or "false").lower() == "true"
+# segmented renditions of recorded exams, packaged from the mp4 h264 encoding ( DASH needs gstreamer >= 1.20 dashsink )
+EXAM_VIDEO_HLS_ENABLED = (os.getenv("EXAM_VIDEO_HLS_ENABLED") or "true").lower() == "true"
+EXAM_VIDEO_DASH_ENABLED = (os.getenv("EXAM_VIDEO_DASH_ENABLED") or "false").lower() == "true"
+# bitrate ladder, extra h264 renditions ( mp4 + hls variant playlists under a master playlist )
+# WIDTHxHEIGHT@KBPS comma separated, ex: 1920x1080@5000,1280x720@2800,854x480@1400
+EXAM_VIDEO_LADDER = [
+    {
+        'name': "{height}p".format(height=variant.split('@')[0].split('x')[1]),
+        'width': int(variant.split('@')[0].split('x')[0]),
+        'height': int(variant.split('@')[0].split('x')[1]),
+        'bitrate': int(variant.split('@')[1]),
+    }
+    for variant in (os.getenv("EXAM_VIDEO_LADDER") or "").split(",") if variant.strip()
+]
+# H.264 sources are remuxed ( no decode/encode ) to the source resolution mp4/hls/dash renditions
+TRANSCODING_REMUX_ENABLED = (os.getenv("TRANSCODING_REMUX_ENABLED") or "true").lower() == "true"
+# exams longer than TRANSCODING_PARALLEL_MIN_DURATION seconds are encoded on this many segments in parallel
+# ( about one per core ), 1 disables it
+TRANSCODING_PARALLEL_SEGMENTS = int(os.getenv("TRANSCODING_PARALLEL_SEGMENTS") or 1)
+TRANSCODING_PARALLEL_MIN_DURATION = int(os.getenv("TRANSCODING_PARALLEL_MIN_DURATION") or 600)
+# in process media probe ( duration, codec, resolution, frame rate ), results are cached by upload id
+MEDIA_PROBE_TIMEOUT = 10
+MEDIA_PROBE_CACHE_TIMEOUT = 24 * 60 * 60
+# seconds the device reported duration can differ from the probed one before it is replaced
+MEDIA_PROBE_DURATION_TOLERANCE = 2
+# pipelines whose position and frame counters do not advance for TRANSCODING_WATCHDOG_STALL_TIMEOUT seconds, or that
+# run longer than TRANSCODING_WATCHDOG_MIN_BUDGET + TRANSCODING_WATCHDOG_BUDGET_FACTOR * probed duration seconds, are aborted
+TRANSCODING_WATCHDOG_STALL_TIMEOUT = int(os.getenv("TRANSCODING_WATCHDOG_STALL_TIMEOUT") or 120)
+TRANSCODING_WATCHDOG_BUDGET_FACTOR = float(os.getenv("TRANSCODING_WATCHDOG_BUDGET_FACTOR") or 10)
+TRANSCODING_WATCHDOG_MIN_BUDGET = int(os.getenv("TRANSCODING_WATCHDOG_MIN_BUDGET") or 300)
+# opt-in, matroska uploads are transcoded while their chunks arrive ( once TRANSCODING_PROGRESSIVE_MIN_BYTES are there )
+# so most of the encoding overlaps the transfer, pipelines wait up to TRANSCODING_PROGRESSIVE_STALL_TIMEOUT seconds for new chunks
+TRANSCODING_PROGRESSIVE_ENABLED = (os.getenv("TRANSCODING_PROGRESSIVE_ENABLED") or "false").lower() == "true"
+TRANSCODING_PROGRESSIVE_MIN_BYTES = int(os.getenv("TRANSCODING_PROGRESSIVE_MIN_BYTES") or 4 * 1024 * 1024)
+TRANSCODING_PROGRESSIVE_STALL_TIMEOUT = int(os.getenv("TRANSCODING_PROGRESSIVE_STALL_TIMEOUT") or 600)
+# local copy of the uploads kept on an object storage ( see FILE_UPLOAD_STORAGE ) while they are transcoded
+TRANSCODING_WORK_DIR = os.getenv("TRANSCODING_WORK_DIR") or os.path.join(MEDIA_ROOT, "transcoding")
+# incomplete uploads, orphaned raw videos and temp outputs untouched for UPLOAD_REAPER_TTL seconds are removed
+# ( see UploadReaperJob ), UPLOAD_REAPER_BATCH_SIZE rows / files at a time
+UPLOAD_REAPER_TTL = int(os.getenv("UPLOAD_REAPER_TTL") or 3 * 24 * 3600)
+UPLOAD_REAPER_BATCH_SIZE = int(os.getenv("UPLOAD_REAPER_BATCH_SIZE") or 100)
+# encoder presets ( see api/video_utils/encoder_presets.py: quality, default, fast, fastest )
+TRANSCODING_ENCODER_PRESET = os.getenv("TRANSCODING_ENCODER_PRESET") or "default"
+# per exercise type, EXERCISE_TYPE:PRESET comma separated, ex: regular:fast,tutorial:quality
+TRANSCODING_ENCODER_PRESETS_BY_EXERCISE_TYPE = dict(
+    (item.split(':')[0].strip().lower(), item.split(':')[1].strip())
+    for item in (os.getenv("TRANSCODING_ENCODER_PRESETS_BY_EXERCISE_TYPE") or "").split(",") if item.strip()
+)
+# by queue depth ( claimable requests ), MIN_DEPTH:PRESET comma separated, ex: 20:fast,100:fastest
+# the preset of the highest reached depth wins over the previous ones
+TRANSCODING_ENCODER_PRESETS_BY_QUEUE_DEPTH = sorted(
+    (int(item.split(':')[0]), item.split(':')[1].strip())
+    for item in (os.getenv("TRANSCODING_ENCODER_PRESETS_BY_QUEUE_DEPTH") or "").split(",") if item.strip()
+)
+# renditions ( ogg, webm ) generated from the mp4 one the first time they are played, instead of on upload
+# ex: ogg,webm, empty encodes all of them eagerly
+EXAM_VIDEO_LAZY_RENDITIONS = [rendition.strip() for rendition in
+                              (os.getenv("EXAM_VIDEO_LAZY_RENDITIONS") or "").split(",") if rendition.strip()]
+# generated lazy renditions not played for this many seconds are evicted
+EXAM_VIDEO_LAZY_MAX_IDLE = int(os.getenv("EXAM_VIDEO_LAZY_MAX_IDLE") or 30 * 24 * 60 * 60)
+# bytes, least recently played lazy renditions are evicted above it, 0 is unbounded
+EXAM_VIDEO_LAZY_CACHE_SIZE = int(os.getenv("EXAM_VIDEO_LAZY_CACHE_SIZE") or 0)
+# poster and preview sprite ( seek bar thumbnails ), a frame every EXAM_VIDEO_THUMBNAILS_INTERVAL seconds
+EXAM_VIDEO_THUMBNAILS_ENABLED = (os.getenv("EXAM_VIDEO_THUMBNAILS_ENABLED") or "true").lower() == "true"
+EXAM_VIDEO_THUMBNAILS_INTERVAL = int(os.getenv("EXAM_VIDEO_THUMBNAILS_INTERVAL") or 10)
+EXAM_VIDEO_POSTER_SIZE = (640, 360)
+EXAM_VIDEO_SPRITE_TILE_SIZE = (160, 90)
+EXAM_VIDEO_SPRITE_COLUMNS = 10
+# admission control, uploads are rejected ( 503 + Retry-After ) and transcoding workers stop claiming requests
+# when the free space of DISK_SPACE_PATH minus the expected footprint of the work in progress goes below
+# DISK_SPACE_MIN_FREE bytes
+DISK_SPACE_PATH = os.getenv("DISK_SPACE_PATH") or MEDIA_ROOT
+DISK_SPACE_MIN_FREE = int(os.getenv("DISK_SPACE_MIN_FREE") or 2 * 1024 * 1024 * 1024)
+DISK_SPACE_RETRY_AFTER = int(os.getenv("DISK_SPACE_RETRY_AFTER") or 300)
+# expected disk footprint of a transcoding request ( renditions, thumbnails, segments ) as a multiple of its source size
+TRANSCODING_DISK_FOOTPRINT_FACTOR = float(os.getenv("TRANSCODING_DISK_FOOTPRINT_FACTOR") or 3)
+# resumable upload chunk size, must be a multiple of 256KB, bounds the memory used per rendition
+TRANSCODING_STREAM_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 ALLOWED_HOSTS = ['*']
 
 FROM_EMAIL = os.getenv("FROM_EMAIL")
@@ -242,6 +338,11 @@ GS_PROJECT_ID = os.getenv("GS_PROJECT_ID")
 GS_CREDENTIALS = service_account.Credentials.from_service_account_file(
     os.path.join(BASE_DIR, 'credentials.json')
 )
+# uploads storage: "local" appends the chunks to a file on the web node ( workers must share its disk ), "gcs" keeps
+# every chunk as an object on GS_UPLOAD_BUCKET_NAME composed server side on completion, so web nodes are stateless and
+# any worker fetches the source, "local-parts" does the same on the local disk ( tests / single node )
+FILE_UPLOAD_STORAGE = os.getenv("FILE_UPLOAD_STORAGE") or "local"
+GS_UPLOAD_BUCKET_NAME = os.getenv("GS_UPLOAD_BUCKET_NAME") or GS_BUCKET_NAME
 
 DEBUG_EMAIL = os.getenv("DEBUG_EMAIL")
 
@@ -292,6 +393,10 @@ LOGGING = {
 }
 
 DRF_CHUNKED_UPLOAD_STORAGE_CLASS = FileSystemStorage
+if FILE_UPLOAD_STORAGE == "gcs":
+    from api.utils.composable_storage import ComposableGoogleCloudStorage as DRF_CHUNKED_UPLOAD_STORAGE_CLASS
+elif FILE_UPLOAD_STORAGE == "local-parts":
+    from api.utils.composable_storage import ComposableFileSystemStorage as DRF_CHUNKED_UPLOAD_STORAGE_CLASS
 # Import local settings
 try:
     from .settings_local import *